@@ -9,6 +9,16 @@ from robot_hat import Ultrasonic
 import os
 from robot_hat import Music
 
+#camera stack is optional off the robot, so import it once here instead of on every capture
+try:
+    from vilib import Vilib
+    import cv2
+    _HAS_VILIB = True
+except ImportError:
+    Vilib = None
+    cv2 = None
+    _HAS_VILIB = False
+
 #global variable for the picarx object
 _picarx = None
 
@@ -180,9 +190,11 @@ _vilib_initialized = False
 def init_camera() -> None:
     """Initialize the camera system. Call this once at startup."""
     global _vilib_initialized
+    if not _HAS_VILIB:
+        print("Camera initialization error: vilib is not installed")
+        return
     if not _vilib_initialized:
         try:
-            from vilib import Vilib
             Vilib.camera_start(vflip=False, hflip=False)
             Vilib.display(local=False, web=True)
             
@@ -200,10 +212,10 @@ def init_camera() -> None:
 
 def capture_image(filename: str = "img_capture.jpg") -> None:
     """Capture an image from the camera and save to filename. Camera must be initialized first."""
+    if not _HAS_VILIB:
+        print("Camera capture error: vilib is not installed")
+        return
     try:
-        from vilib import Vilib
-        import cv2
-        
         # Initialize camera if not already done
         if not _vilib_initialized:
             init_camera()
@@ -220,16 +232,15 @@ def capture_image(filename: str = "img_capture.jpg") -> None:
 
 def take_photo_vilib(name: str = None, path: str = "./") -> str:
     """Take a photo using Vilib's built-in photo function."""
+    if not _HAS_VILIB:
+        print("Photo capture error: vilib is not installed")
+        return ""
     try:
-        from vilib import Vilib
-        import time
-        
         if not _vilib_initialized:
             init_camera()
         
         if name is None:
-            from time import strftime, localtime
-            name = f'photo_{strftime("%Y-%m-%d-%H-%M-%S", localtime(time.time()))}'
+            name = f'photo_{time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime())}'
         
         Vilib.take_photo(name, path)
         full_path = f"{path}{name}.jpg"
@@ -244,7 +255,6 @@ def close_camera() -> None:
     global _vilib_initialized
     if _vilib_initialized:
         try:
-            from vilib import Vilib
             Vilib.camera_close()
             _vilib_initialized = False
             print("Camera closed")
@@ -14,12 +14,19 @@ Usage:
     python primitive_cli.py move_forward 50 2  # Run move_forward with args
 """
 
+import re
 import sys
 import inspect
 import argparse
 from typing import Any, Dict, List, Tuple
 from final_primitives import *
 
+# Common argument shapes -> converter, tried in order before the int()/float() fallback
+_ARG_CONVERTERS = (
+    (re.compile(r'[+-]?\d+'), int),
+    (re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'), float),
+)
+
 class PrimitiveCLI:
     def __init__(self):
         self.excluded_functions = {'get_picarx'}  # Functions to exclude from CLI
@@ -153,17 +160,21 @@ INTERACTIVE MODE:
             return ()
         
         parsed_args = []
-        for i, arg in enumerate(args):
-            try:
-                # Try to convert to int first
-                parsed_args.append(int(arg))
-            except ValueError:
+        for arg in args:
+            for pattern, convert in _ARG_CONVERTERS:
+                if pattern.fullmatch(arg):
+                    parsed_args.append(convert(arg))
+                    break
+            else:
+                # Rarer spellings int()/float() also accept ('1_000', 'inf', ' 5'),
+                # otherwise keep as string
                 try:
-                    # Try to convert to float
-                    parsed_args.append(float(arg))
+                    parsed_args.append(int(arg))
                 except ValueError:
-                    # Keep as string
-                    parsed_args.append(arg)
+                    try:
+                        parsed_args.append(float(arg))
+                    except ValueError:
+                        parsed_args.append(arg)
         
         return tuple(parsed_args)
     
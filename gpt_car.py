@@ -50,6 +50,11 @@ TTS_VOICE = 'echo'
 
 SOUND_EFFECT_ACTIONS = ["honking", "start engine"]
 
+# frames sent with a question are capped to this long side and JPEG quality,
+# the vision model doesn't need more and the upload is smaller
+IMG_MAX_SIDE = 768
+IMG_JPEG_QUALITY = 80
+
 # car init 
 # =================================================================
 try:
@@ -280,7 +285,12 @@ def main():
 
         if with_img:
             img_path = './img_imput.jpg'
-            cv2.imwrite(img_path, Vilib.img)
+            img = Vilib.img
+            h, w = img.shape[:2]
+            if max(h, w) > IMG_MAX_SIDE:
+                scale = IMG_MAX_SIDE / max(h, w)
+                img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            cv2.imwrite(img_path, img, [cv2.IMWRITE_JPEG_QUALITY, IMG_JPEG_QUALITY])
             response = openai_helper.dialogue_with_img(_result, img_path)
         else:
             response = openai_helper.dialogue(_result)
@@ -1,4 +1,5 @@
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient
+import httpx
 import time
 import shutil
 import os
@@ -48,6 +49,9 @@ class OpenAiHelper():
     STT_OUT = "stt_output.wav"
     TTS_OUTPUT_FILE = 'tts_output.mp3'
     TIMEOUT = 30 # seconds
+    # keep the API connection open between turns; httpx would otherwise drop it
+    # after 5 s idle and every spoken turn would pay a new TLS handshake
+    HTTP_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=60.0)
 
     def __init__(self, api_key, assistant_id, assistant_name, timeout=TIMEOUT) -> None:
         
@@ -55,7 +59,8 @@ class OpenAiHelper():
         self.assistant_id = assistant_id
         self.assistant_name = assistant_name
 
-        self.client = OpenAI(api_key=api_key, timeout=timeout)
+        self.client = OpenAI(api_key=api_key, timeout=timeout,
+                             http_client=DefaultHttpxClient(limits=self.HTTP_LIMITS))
         self.thread = self.client.beta.threads.create()
         self.run = self.client.beta.threads.runs.create_and_poll(
             thread_id=self.thread.id,
@@ -152,10 +157,11 @@ class OpenAiHelper():
     def dialogue_with_img(self, msg, img_path):
         chat_print(f"user", msg)
 
-        img_file = self.client.files.create(
-                    file=open(img_path, "rb"),
-                    purpose="vision"
-                )
+        with open(img_path, "rb") as f:
+            img_file = self.client.files.create(
+                        file=f,
+                        purpose="vision"
+                    )
 
         message =  self.client.beta.threads.messages.create(
             thread_id= self.thread.id,
@@ -0,0 +1,81 @@
+"""
+openai_pool.py
+
+Shared, keep-alive OpenAI HTTP clients for the Agents SDK based Picar-X agents.
+Use run_sync() instead of Runner.run_sync: it runs the agent on one long-lived
+event loop, so every run reuses the same connection pool instead of opening a
+fresh TLS connection per run.
+"""
+
+import asyncio
+import threading
+
+import httpx
+from openai import AsyncOpenAI
+from agents import ModelProvider, OpenAIProvider, RunConfig, Runner
+
+# Keep-alive pool shared by all agents running on the same event loop
+HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=60.0)
+
+class PooledOpenAIProvider(ModelProvider):
+    """Model provider that keeps one pooled AsyncOpenAI client per long-lived event loop.
+
+    httpx connections are bound to the loop that opened them, so a client is
+    only cached for loops started with get_loop(), which never close. Runs on
+    any other loop use the SDK's default provider, so short-lived loops leave
+    nothing behind in the cache. Clients are built on first use, after the
+    agents have copied keys.OPENAI_API_KEY into the environment.
+    """
+
+    def __init__(self):
+        self._loops = set()
+        self._providers = {}
+        self._fallback = None
+
+    def register(self, loop) -> None:
+        """Mark a long-lived loop as one that gets its own pooled client."""
+        self._loops.add(loop)
+
+    def get_model(self, model_name):
+        loop = asyncio.get_running_loop()
+        provider = self._providers.get(loop)
+        if provider is None:
+            if loop in self._loops:
+                client = AsyncOpenAI(http_client=httpx.AsyncClient(limits=HTTP_LIMITS))
+                provider = self._providers[loop] = OpenAIProvider(openai_client=client)
+            else:
+                if self._fallback is None:
+                    self._fallback = OpenAIProvider()
+                provider = self._fallback
+        return provider.get_model(model_name)
+
+_PROVIDER = PooledOpenAIProvider()
+RUN_CONFIG = RunConfig(model_provider=_PROVIDER)
+
+# Long-lived loops by name, each started on its own daemon thread on first use
+_loops = {}
+_loops_lock = threading.Lock()
+
+def get_loop(name: str) -> asyncio.AbstractEventLoop:
+    """Return the long-lived event loop called name, starting it on first use."""
+    with _loops_lock:
+        loop = _loops.get(name)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            _PROVIDER.register(loop)
+            threading.Thread(target=loop.run_forever, name=name, daemon=True).start()
+            _loops[name] = loop
+        return loop
+
+# Name of the loop every run_sync() call runs on
+AGENT_LOOP = "openai-agents"
+
+def run_sync(agent, input, **kwargs):
+    """Runner.run_sync replacement that runs on the agent loop and its pooled client.
+
+    Safe to call from several threads at once; the runs overlap on the loop.
+    Must not be called from a tool running on the agent loop itself.
+    """
+    kwargs.setdefault("run_config", RUN_CONFIG)
+    coro = Runner.run(agent, input, **kwargs)
+    return asyncio.run_coroutine_threadsafe(coro, get_loop(AGENT_LOOP)).result()
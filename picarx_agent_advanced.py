@@ -6,7 +6,10 @@ This version supports long-form tasks with memory, planning, and iterative decis
 """
 
 import os
+import re
 import sys
+import glob
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 from agents import Agent, Runner
 from agents import function_tool
@@ -14,12 +17,16 @@ from agents.memory import SQLiteSession
 import time
 import json
 import base64
+import hashlib
+import asyncio
 from PIL import Image
 import io
 
 # Import the primitives and keys
 from picarx_primitives import *
 from keys import OPENAI_API_KEY
+from openai_pool import RUN_CONFIG, get_loop, run_sync
+from agents import RunConfig
 
 # Global variables for task state
 current_task = None
@@ -27,6 +34,56 @@ task_plan = []
 current_step = 0
 task_history = []
 
+# Patterns for pulling numbers out of navigation guidance and commands
+# Distances: one pass covers decimals and both spellings, so '12.5 cm' reads as 12.5, not 5
+_CM_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:cm|centimet(?:er|re))')
+_DEGREES_RE = re.compile(r'(\d+)\s*degree')
+_NUMBER_RE = re.compile(r'(\d+)')
+
+# Image analysis runs on its own long-lived loop with its own pooled client: the
+# upload tool is called from agent runs on the agent loop, so it can't block on that one
+_VISION_LOOP = "vision"
+VISION_RUN_CONFIG = RunConfig(model="gpt-4o", model_provider=RUN_CONFIG.model_provider)
+
+# Vision uploads are downscaled client-side; the model tiles images at 512px anyway
+VISION_MAX_SIDE = 512
+VISION_JPEG_QUALITY = 75
+
+# Recent encodings keyed by (path, inode, size, mtime, max_side), so re-analysing an unchanged photo skips the work
+_VISION_CACHE_SIZE = 10
+_vision_b64_cache = {}
+
+def _encode_image_for_vision(path: str, max_side: int = VISION_MAX_SIDE) -> str:
+    """Downscale an image to fit max_side and return it as base64-encoded JPEG."""
+    st = os.stat(path)
+    # Size and inode catch rewrites that land within the filesystem's mtime granularity
+    key = (path, st.st_ino, st.st_size, st.st_mtime_ns, max_side)
+    cached = _vision_b64_cache.get(key)
+    if cached is not None:
+        return cached
+    with Image.open(path) as img:
+        # For JPEGs, let the decoder scale by 1/2, 1/4 or 1/8 during the IDCT; no-op otherwise
+        img.draft("RGB", (max_side, max_side))
+        img.thumbnail((max_side, max_side))
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, format="JPEG", quality=VISION_JPEG_QUALITY)
+    # Encode from a view of the buffer rather than a getvalue() copy; base64 output is pure ASCII
+    encoded = base64.b64encode(buf.getbuffer()).decode("ascii")
+    if len(_vision_b64_cache) >= _VISION_CACHE_SIZE:
+        # Dicts keep insertion order, so this evicts the oldest entry
+        del _vision_b64_cache[next(iter(_vision_b64_cache))]
+    _vision_b64_cache[key] = encoded
+    return encoded
+
+# Finished analyses keyed by (image content digest, context); the same photo asked
+# about the same way is answered without another round trip
+_ANALYSIS_CACHE_SIZE = 20
+_analysis_cache = {}
+
+def _analysis_key(base64_images: str, context: str) -> tuple:
+    """Cache key for an analysis of encoded image data under a given context."""
+    return (hashlib.blake2b(base64_images.encode("ascii"), digest_size=16).digest(), context)
+
 # Standalone tool functions
 @function_tool
 def reset_tool() -> str:
@@ -251,52 +308,14 @@ Based on your analysis, provide specific navigation instructions."""
     except Exception as e:
         return f"Error checking current direction: {str(e)}"
 
-@function_tool
-def upload_image_with_context(filename: str, context: str) -> str:
-    """Upload an image file with contextual information for analysis using OpenAI Agents SDK."""
-    print(f"🔧 TOOL CALLED: upload_image_with_context('{filename}')")
-    try:
-        import os
-        import base64
-        from agents import Agent, Runner
-        
-        if not os.path.exists(filename):
-            print(f"❌ Image file not found: {filename}")
-            return f"Image file {filename} not found"
-        
-        print(f"📸 Processing image: {filename}")
-        
-        # Read and encode the image as base64 (following official Agents SDK documentation)
-        with open(filename, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode("utf-8")
-        
-        print(f"📤 Encoding image as base64...")
-        print(f"✅ Image encoded, size: {len(base64_image)} characters")
-        
-        # Create the message with image using correct Agents SDK format (from official docs)
-        message_with_image = [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "input_image",
-                        "detail": "auto",
-                        "image_url": f"data:image/jpeg;base64,{base64_image}",
-                    }
-                ],
-            },
-            {
-                "role": "user",
-                "content": context,
-            },
-        ]
-        
-        # Create a simple analysis agent for this specific image (following gpt_car.py pattern)
-        from keys import OPENAI_API_KEY
-        
+_IMAGE_ANALYSIS_AGENT: Optional[Agent] = None
+
+def _get_image_analysis_agent() -> Agent:
+    """Return the shared image analysis agent, building it on first use."""
+    global _IMAGE_ANALYSIS_AGENT
+    if _IMAGE_ANALYSIS_AGENT is None:
         os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
-        
-        analysis_agent = Agent(
+        _IMAGE_ANALYSIS_AGENT = Agent(
             name="Robot Navigation Image Analyzer",
             instructions="""You are an expert at analyzing images for robot navigation and escape room scenarios.
             
@@ -307,49 +326,97 @@ def upload_image_with_context(filename: str, context: str) -> str:
             4. Distance estimates for objects and clearances
             5. Whether this direction appears to be a viable exit
             
+            When given several images, they are views from the same position in the order listed;
+            analyze each one and say which view is the best way out.
+            
             Be specific, actionable, and safety-focused in your guidance. The robot needs clear instructions."""
         )
-        
-        # Send the image for analysis with vision-capable model (following gpt_car.py approach)
-        from agents import RunConfig
-        
-        run_config = RunConfig(
-            model="gpt-4o"  # Use gpt-4o for vision analysis
-        )
-        
-        print(f"🔍 SENDING IMAGE TO ANALYSIS AGENT...")
-        print(f"📸 Image: {filename}")
-        print(f"📝 Context length: {len(context)} characters")
-        print(f"🤖 Model: gpt-4o")
-        print(f"📋 Message format: Two separate user messages (image + text)")
-        print(f"🔧 Base64 length: {len(base64_image)} characters")
-        print(f"🎯 Detail level: auto")
-        
-        # Use async Runner.run as shown in official documentation
-        import asyncio
-        
-        async def analyze_image_async():
-            return await Runner.run(analysis_agent, message_with_image, run_config=run_config)
-        
-        # Run the async function
-        result = asyncio.run(analyze_image_async())
-        
-        print(f"✅ ANALYSIS AGENT RESPONSE RECEIVED")
-        print(f"📊 Result type: {type(result)}")
-        print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-        print(f"💬 Final output length: {len(result.final_output)} characters")
-        print(f"📋 Full analysis result:")
-        print("-" * 50)
-        print(result.final_output)
-        print("-" * 50)
-        
-        analysis_result = result.final_output
-        
+    return _IMAGE_ANALYSIS_AGENT
+
+def _analyze_images(filenames: List[str], context: str) -> str:
+    """Send one or more images plus context to the analysis agent in a single request."""
+    for filename in filenames:
+        if not os.path.exists(filename):
+            print(f"❌ Image file not found: {filename}")
+            return f"Image file {filename} not found"
+    
+    # Downscale and encode each image as base64 (following official Agents SDK documentation)
+    print(f"📤 Encoding {len(filenames)} image(s) as base64...")
+    base64_images = [_encode_image_for_vision(filename) for filename in filenames]
+    print(f"✅ Images encoded, size: {sum(len(b) for b in base64_images)} characters")
+    
+    analysis_key = _analysis_key("".join(base64_images), context)
+    analysis_result = _analysis_cache.get(analysis_key)
+    if analysis_result is not None:
+        print(f"♻️ Reusing earlier analysis of identical images and context")
+        return analysis_result
+    
+    # Every image goes in one message so the batch costs a single round trip
+    message_with_images = [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "input_image",
+                    "detail": "auto",
+                    "image_url": f"data:image/jpeg;base64,{base64_image}",
+                }
+                for base64_image in base64_images
+            ],
+        },
+        {
+            "role": "user",
+            "content": context,
+        },
+    ]
+    
+    print(f"🔍 SENDING {len(filenames)} IMAGE(S) TO ANALYSIS AGENT...")
+    print(f"📸 Images: {', '.join(filenames)}")
+    print(f"📝 Context length: {len(context)} characters")
+    print(f"🤖 Model: gpt-4o")
+    
+    # Use async Runner.run as shown in official documentation, on the shared vision loop
+    # with a vision-capable model (following gpt_car.py approach)
+    result = asyncio.run_coroutine_threadsafe(
+        Runner.run(_get_image_analysis_agent(), message_with_images, run_config=VISION_RUN_CONFIG),
+        get_loop(_VISION_LOOP)
+    ).result()
+    
+    print(f"✅ ANALYSIS AGENT RESPONSE RECEIVED")
+    print(f"💬 Final output length: {len(result.final_output)} characters")
+    print(f"📋 Full analysis result:")
+    print("-" * 50)
+    print(result.final_output)
+    print("-" * 50)
+    
+    analysis_result = result.final_output
+    if len(_analysis_cache) >= _ANALYSIS_CACHE_SIZE:
+        del _analysis_cache[next(iter(_analysis_cache))]
+    _analysis_cache[analysis_key] = analysis_result
+    return analysis_result
+
+@function_tool
+def upload_image_with_context(filename: str, context: str) -> str:
+    """Upload an image file with contextual information for analysis using OpenAI Agents SDK."""
+    print(f"🔧 TOOL CALLED: upload_image_with_context('{filename}')")
+    try:
+        analysis_result = _analyze_images([filename], context)
         return f"🤖 IMAGE ANALYSIS COMPLETE 🤖\n\nFile: {filename}\nAnalysis:\n{analysis_result}\n\nUse this guidance to navigate the robot safely."
         
     except Exception as e:
         return f"Error uploading and analyzing image: {str(e)}"
 
+@function_tool
+def upload_images_with_context(filenames: List[str], context: str) -> str:
+    """Upload several image files (e.g. the views of one scan) with context, analyzed together in one request."""
+    print(f"🔧 TOOL CALLED: upload_images_with_context({filenames})")
+    try:
+        analysis_result = _analyze_images(filenames, context)
+        return f"🤖 IMAGE ANALYSIS COMPLETE 🤖\n\nFiles: {', '.join(filenames)}\nAnalysis:\n{analysis_result}\n\nUse this guidance to navigate the robot safely."
+        
+    except Exception as e:
+        return f"Error uploading and analyzing images: {str(e)}"
+
 @function_tool
 def receive_navigation_guidance_tool(guidance: str) -> str:
     """Receive navigation guidance from advanced agent analysis and execute appropriate actions."""
@@ -361,10 +428,9 @@ def receive_navigation_guidance_tool(guidance: str) -> str:
         # Parse guidance and execute actions
         if "move forward" in guidance_lower or "go forward" in guidance_lower:
             # Extract distance if mentioned
-            import re
-            distance_match = re.search(r'(\d+)\s*(cm|centimeter)', guidance_lower)
+            distance_match = _CM_RE.search(guidance_lower)
             if distance_match:
-                distance = int(distance_match.group(1))
+                distance = float(distance_match.group(1))
                 duration = distance / 20  # Rough conversion
                 result = drive_forward_tool(30, duration)
                 response += f"- {result}\n"
@@ -374,25 +440,22 @@ def receive_navigation_guidance_tool(guidance: str) -> str:
                 
         elif "turn right" in guidance_lower:
             # Extract degrees if mentioned
-            import re
-            degrees_match = re.search(r'(\d+)\s*degree', guidance_lower)
+            degrees_match = _DEGREES_RE.search(guidance_lower)
             degrees = int(degrees_match.group(1)) if degrees_match else 45
             result = turn_in_place_right_tool(degrees)
             response += f"- {result}\n"
             
         elif "turn left" in guidance_lower:
             # Extract degrees if mentioned
-            import re
-            degrees_match = re.search(r'(\d+)\s*degree', guidance_lower)
+            degrees_match = _DEGREES_RE.search(guidance_lower)
             degrees = int(degrees_match.group(1)) if degrees_match else 45
             result = turn_in_place_left_tool(degrees)
             response += f"- {result}\n"
             
         elif "back up" in guidance_lower or "move backward" in guidance_lower:
             # Extract distance if mentioned
-            import re
-            distance_match = re.search(r'(\d+)\s*(cm|centimeter)', guidance_lower)
-            distance = int(distance_match.group(1)) if distance_match else 20
+            distance_match = _CM_RE.search(guidance_lower)
+            distance = float(distance_match.group(1)) if distance_match else 20
             result = move_backward_safe_tool(distance)
             response += f"- {result}\n"
             
@@ -489,7 +552,6 @@ def rotate_in_place_tool(degrees: float, speed: int = 30) -> str:
 def analyze_image_tool(filename: str = "img_capture.jpg") -> str:
     """Save image for manual analysis via file upload."""
     try:
-        import os
         if os.path.exists(filename):
             return f"Image {filename} captured and saved. Please upload this file to analyze what the robot sees for navigation guidance."
         else:
@@ -501,10 +563,6 @@ def analyze_image_tool(filename: str = "img_capture.jpg") -> str:
 def prepare_analysis_report_tool() -> str:
     """Generate a comprehensive report of sensor data and images for external analysis."""
     try:
-        import glob
-        import os
-        from datetime import datetime
-        
         # Find all recent scan photos
         scan_photos = glob.glob("scan_360_*.jpg")
         other_photos = glob.glob("img_capture*.jpg") + glob.glob("assessment_*.jpg")
@@ -561,22 +619,19 @@ def execute_navigation_command_tool(command: str) -> str:
         
         if "rotate" in command and "clockwise" in command:
             # Extract degrees if specified
-            import re
-            degrees_match = re.search(r'(\d+)', command)
+            degrees_match = _NUMBER_RE.search(command)
             degrees = int(degrees_match.group(1)) if degrees_match else 90
             return rotate_in_place_tool(degrees)
             
         elif "rotate" in command and ("counter" in command or "left" in command):
             # Extract degrees if specified
-            import re
-            degrees_match = re.search(r'(\d+)', command)
+            degrees_match = _NUMBER_RE.search(command)
             degrees = int(degrees_match.group(1)) if degrees_match else 90
             return rotate_in_place_tool(-degrees)
             
         elif "move forward" in command or "drive forward" in command:
             # Extract distance/duration if specified
-            import re
-            distance_match = re.search(r'(\d+)', command)
+            distance_match = _NUMBER_RE.search(command)
             if distance_match:
                 duration = int(distance_match.group(1)) / 10  # Convert cm to rough duration
                 return drive_forward_tool(30, duration)
@@ -584,8 +639,7 @@ def execute_navigation_command_tool(command: str) -> str:
                 return drive_forward_tool(30, 2)  # Default 2 seconds
                 
         elif "move backward" in command or "back up" in command:
-            import re
-            distance_match = re.search(r'(\d+)', command)
+            distance_match = _NUMBER_RE.search(command)
             distance = int(distance_match.group(1)) if distance_match else 20
             return move_backward_safe_tool(distance)
             
@@ -781,6 +835,7 @@ def create_advanced_agent():
         - Use receive_navigation_guidance_tool to execute recommended actions
         - This creates a seamless loop: capture → upload → analyze → execute → repeat
         - Images are uploaded with specific context about what guidance is needed
+        - To compare several photos (e.g. scan views), send them together with upload_images_with_context
         
         Always prioritize safety - use in-place rotation instead of forward-turning movements.""",
         tools=[
@@ -803,6 +858,7 @@ def create_advanced_agent():
             turn_in_place_left_tool,
             check_current_direction_tool,
             upload_image_with_context,
+            upload_images_with_context,
             receive_navigation_guidance_tool,
             move_backward_safe_tool,
             assess_environment_tool,
@@ -821,26 +877,37 @@ def execute_long_form_task(agent, session, task_description: str) -> str:
     """Execute a long-form task with planning and iteration."""
     try:
         # Create a plan
-        plan_result = Runner.run_sync(agent, f"Create a plan for: {task_description}", session=session)
+        plan_result = run_sync(agent, f"Create a plan for: {task_description}", session=session)
         print(f"Plan created: {plan_result.final_output}")
         
         # Execute the plan step by step
         while current_step < len(task_plan):
-            step_result = Runner.run_sync(agent, f"Execute the next step in the plan", session=session)
+            step_result = run_sync(agent, f"Execute the next step in the plan", session=session)
             print(f"Step {current_step + 1}: {step_result.final_output}")
             
             # Check if we need to adapt the plan
             if "obstacle" in step_result.final_output.lower() or "blocked" in step_result.final_output.lower():
-                adapt_result = Runner.run_sync(agent, "The path is blocked. Adapt the plan to find an alternative route.", session=session)
+                adapt_result = run_sync(agent, "The path is blocked. Adapt the plan to find an alternative route.", session=session)
                 print(f"Plan adapted: {adapt_result.final_output}")
         
         # Get final status
-        status_result = Runner.run_sync(agent, "Get the final task status", session=session)
+        status_result = run_sync(agent, "Get the final task status", session=session)
         return status_result.final_output
         
     except Exception as e:
         return f"Error executing long-form task: {str(e)}"
 
+# REPL command -> (banner, prompt sent to the agent)
+_REPL_COMMANDS = {
+    'reset': ("🔄 EXECUTING RESET COMMAND", "Reset the robot"),
+    'status': ("📊 EXECUTING STATUS COMMAND", "Get the current task status"),
+    'memory': ("🧠 EXECUTING MEMORY COMMAND", "Tell me what you remember about our previous conversations and interactions"),
+    'check': ("🔍 EXECUTING CHECK DIRECTION COMMAND", "Check the current direction for potential exits"),
+    'turn right': ("↪️ EXECUTING TURN RIGHT COMMAND", "Turn right in place 45 degrees"),
+    'turn left': ("↩️ EXECUTING TURN LEFT COMMAND", "Turn left in place 45 degrees"),
+    'report': ("📊 EXECUTING REPORT COMMAND", "Prepare an analysis report for the current images and sensor data"),
+}
+
 def main():
     """Main function to run the advanced Picar-X agent."""
     # Check for API key
@@ -872,58 +939,22 @@ def main():
             # Get user input from keyboard
             user_input = input("You: ").strip()
             
-            if user_input.lower() == 'quit':
+            cmd = user_input.lower()
+            if cmd == 'quit':
                 break
-            elif user_input.lower() == 'reset':
-                print(f"🔄 EXECUTING RESET COMMAND")
-                result = Runner.run_sync(agent, "Reset the robot", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'status':
-                print(f"📊 EXECUTING STATUS COMMAND")
-                result = Runner.run_sync(agent, "Get the current task status", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'memory':
-                print(f"🧠 EXECUTING MEMORY COMMAND")
-                result = Runner.run_sync(agent, "Tell me what you remember about our previous conversations and interactions", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'check':
-                print(f"🔍 EXECUTING CHECK DIRECTION COMMAND")
-                result = Runner.run_sync(agent, "Check the current direction for potential exits", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'turn right':
-                print(f"↪️ EXECUTING TURN RIGHT COMMAND")
-                result = Runner.run_sync(agent, "Turn right in place 45 degrees", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'turn left':
-                print(f"↩️ EXECUTING TURN LEFT COMMAND")
-                result = Runner.run_sync(agent, "Turn left in place 45 degrees", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower() == 'report':
-                print(f"📊 EXECUTING REPORT COMMAND")
-                result = Runner.run_sync(agent, "Prepare an analysis report for the current images and sensor data", session=session)
-                print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
-                print(f"Agent: {result.final_output}")
-                continue
-            elif user_input.lower().startswith('execute:'):
-                command = user_input[8:].strip()  # Remove 'execute:' prefix
-                print(f"⚡ EXECUTING NAVIGATION COMMAND: '{command}'")
-                result = Runner.run_sync(agent, f"Execute this navigation command: {command}", session=session)
+            
+            command = _REPL_COMMANDS.get(cmd)
+            if command is None and cmd.startswith('execute:'):
+                nav_command = user_input[8:].strip()  # Remove 'execute:' prefix
+                command = (f"⚡ EXECUTING NAVIGATION COMMAND: '{nav_command}'", f"Execute this navigation command: {nav_command}")
+            if command is not None:
+                banner, prompt = command
+                print(banner)
+                result = run_sync(agent, prompt, session=session)
                 print(f"🔧 Tools called: {getattr(result, 'tool_calls', 'None')}")
                 print(f"Agent: {result.final_output}")
                 continue
-            elif "escape" in user_input.lower() or "room" in user_input.lower():
+            if "escape" in cmd or "room" in cmd:
                 print("Agent: Starting complex task execution...")
                 result = execute_long_form_task(agent, session, user_input)
                 print(f"Agent: {result}")
@@ -935,7 +966,7 @@ def main():
                 print(f"\n🚀 SENDING TO MAIN AGENT: '{user_input}'")
                 print(f"📝 Session ID: {session.session_id if session else 'None'}")
                 
-                result = Runner.run_sync(agent, user_input, session=session)
+                result = run_sync(agent, user_input, session=session)
                 
                 print(f"✅ MAIN AGENT RESPONSE RECEIVED")
                 print(f"📊 Result type: {type(result)}")
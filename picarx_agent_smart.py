@@ -7,153 +7,292 @@ vs. when to create and execute plans, with memory persistence.
 """
 
 import os
+import re
 import sys
+import logging
 from typing import List, Optional, Dict, Any
-from agents import Agent, Runner
+import openai
+from agents import Agent, RunConfig, ModelSettings
 from agents import function_tool
 from agents.memory import SQLiteSession
 import time
 import json
-import base64
-from PIL import Image
-import io
+import random
+import socket
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 # Import the primitives and keys
 from picarx_primitives import *
 from keys import OPENAI_API_KEY
+from openai_pool import AGENT_LOOP, RUN_CONFIG, get_loop, run_sync
+from utils import get_sqlite_connection
 
 # Set the environment variable for OpenAI Agents SDK
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
+logger = logging.getLogger("picarx.smart")
+
 # Global variables for task state
 current_task = None
 task_plan = []
 current_step = 0
 task_history = []
 
+# Prefix for inline JPEG image inputs sent to the vision model
+_JPEG_DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+# Size and quality cap for frames sent to the vision model
+_VISION_MAX_EDGE = 1024
+_VISION_JPEG_QUALITY = 75
+
+# Fixed text goes first and per-call values last, so every request shares a cacheable prompt prefix
+ADAPTIVE_PLAN_PROMPT = """Analyze this image to help the robot complete the task given at the end.
+
+Based on what you see, determine:
+1. What is the robot's current situation relative to the task goal?
+2. What should the robot do next to make progress?
+3. What direction should it move (left, right, forward, backward, or stay still)?
+4. How far should it move (small adjustment, medium movement, large movement, or no movement)?
+5. Are there any obstacles or safety concerns?
+
+Provide your analysis in this format:
+SITUATION: [describe current state]
+NEXT_ACTION: [what the robot should do]
+DIRECTION: [left/right/forward/backward/stay]
+DISTANCE: [small/medium/large/none]
+OBSTACLES: [describe any obstacles]
+REASONING: [explain your recommendation]
+PROGRESS: [how much progress toward the goal]
+
+Task: "{task}"
+"""
+IMAGE_ANALYSIS_PROMPT = "Please analyze this image and provide a detailed description of what you see, including any relevant observations for robot navigation or task completion."
+
+# Wall-clock budget and failure backoff for the adaptive plan loop
+_ADAPTIVE_PLAN_BUDGET_S = 120.0
+_ADAPTIVE_SETTLE_S = 1.5
+_ADAPTIVE_MAX_BACKOFF_S = 6.0
+# Request errors another attempt can't fix; the loop gives up on these instead of backing off.
+# Rate limits, timeouts and 5xx are already retried by the SDK before they reach the loop
+_NON_RETRYABLE_ERRORS = (openai.AuthenticationError, openai.PermissionDeniedError,
+                         openai.BadRequestError, openai.NotFoundError)
+
+# Output cap for the seven-field adaptive plan reply; free descriptions get no cap
+_PLAN_MAX_TOKENS = 300
+PLAN_RUN_CONFIG = RunConfig(
+    model_provider=RUN_CONFIG.model_provider,
+    model_settings=ModelSettings(max_tokens=_PLAN_MAX_TOKENS)
+)
+
+# "KEY: value" lines in structured vision replies, matched in one pass
+_KV_RE = re.compile(r'^[ \t]*([A-Z_]+):[ \t]*([^\n]*)', re.M)
+_DIRECTIONS = frozenset(('left', 'right', 'forward', 'backward', 'stay'))
+_DISTANCES = frozenset(('small', 'medium', 'large', 'none'))
+# Reply field -> (action plan key, converter); a converter returning None drops the value
+_ACTION_PLAN_FIELDS = {
+    'SITUATION': ('situation', lambda v: v),
+    'NEXT_ACTION': ('next_action', lambda v: v),
+    'DIRECTION': ('direction', lambda v: v.lower() if v.lower() in _DIRECTIONS else None),
+    'DISTANCE': ('distance', lambda v: v.lower() if v.lower() in _DISTANCES else None),
+    'OBSTACLES': ('obstacles', lambda v: v),
+    'REASONING': ('reasoning', lambda v: v),
+    'PROGRESS': ('progress', lambda v: v),
+}
+
+# Pre-interned error prefixes for the tool functions below
+_TOOL_ERRORS = {
+    label: sys.intern(f"Error {label}: ")
+    for label in (
+        "resetting robot",
+        "setting direction servo",
+        "setting camera pan servo",
+        "setting camera tilt servo",
+        "setting motor speed",
+        "driving forward",
+        "driving backward",
+        "stopping robot",
+        "turning left",
+        "turning right",
+        "getting ultrasound distance",
+        "getting grayscale readings",
+        "capturing image",
+        "analyzing image",
+        "playing sound",
+        "getting robot state",
+        "creating plan",
+    )
+}
+
+# Worker pool for overlapping independent, network-bound agent runs; their
+# run_sync() calls all land on the shared agent loop and its pooled client
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# Short-lived sensor cache: the orchestrator, judge and action agent all probe
+# state at the start of a turn, so readings are reused for a few hundred ms.
+# Any motor or servo tool invalidates it so motion never returns stale state.
+_SENSOR_CACHE = {}
+
+def _cached_reading(name: str, read, ttl: float):
+    """Return the cached value for name if younger than ttl seconds, else re-read."""
+    now = time.monotonic()
+    hit = _SENSOR_CACHE.get(name)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+    value = read()
+    _SENSOR_CACHE[name] = (now, value)
+    return value
+
+def _invalidate_sensor_cache() -> None:
+    _SENSOR_CACHE.clear()
+
 # ============================================================================
 # TOOL FUNCTIONS (same as basic agent)
 # ============================================================================
 
+# Actuator tools flush the primitives' write queue before replying, so a failed
+# hardware write is reported as an error instead of as success
+
 @function_tool
 def reset_tool() -> str:
     """Reset all servos to 0 and stop the motors."""
     try:
+        _invalidate_sensor_cache()
         reset()
         return "Robot reset: all servos to 0, motors stopped"
     except Exception as e:
-        return f"Error resetting robot: {str(e)}"
+        return _TOOL_ERRORS["resetting robot"] + repr(e)
 
 @function_tool
 def set_dir_servo_tool(angle: float) -> str:
     """Set the direction (steering) servo angle (-30 to 30 typical)."""
     try:
+        _invalidate_sensor_cache()
         set_dir_servo(angle)
+        flush_actuators()
         return f"Direction servo set to {angle} degrees"
     except Exception as e:
-        return f"Error setting direction servo: {str(e)}"
+        return _TOOL_ERRORS["setting direction servo"] + repr(e)
 
 @function_tool
 def set_cam_pan_servo_tool(angle: float) -> str:
     """Set the camera pan servo angle (-35 to 35 typical)."""
     try:
+        _invalidate_sensor_cache()
         set_cam_pan_servo(angle)
+        flush_actuators()
         return f"Camera pan servo set to {angle} degrees"
     except Exception as e:
-        return f"Error setting camera pan servo: {str(e)}"
+        return _TOOL_ERRORS["setting camera pan servo"] + repr(e)
 
 @function_tool
 def set_cam_tilt_servo_tool(angle: float) -> str:
     """Set the camera tilt servo angle (-35 to 35 typical)."""
     try:
+        _invalidate_sensor_cache()
         set_cam_tilt_servo(angle)
+        flush_actuators()
         return f"Camera tilt servo set to {angle} degrees"
     except Exception as e:
-        return f"Error setting camera tilt servo: {str(e)}"
+        return _TOOL_ERRORS["setting camera tilt servo"] + repr(e)
 
 @function_tool
 def set_motor_speed_tool(motor_id: int, speed: int) -> str:
     """Set the speed of an individual motor. motor_id: 1 (left), 2 (right), speed: -100 to 100."""
     try:
+        _invalidate_sensor_cache()
         set_motor_speed(motor_id, speed)
+        flush_actuators()
         return f"Motor {motor_id} speed set to {speed}"
     except Exception as e:
-        return f"Error setting motor speed: {str(e)}"
+        return _TOOL_ERRORS["setting motor speed"] + repr(e)
 
 @function_tool
 def drive_forward_tool(speed: int, duration: Optional[float] = None) -> str:
     """Drive forward at given speed (0-100). If duration is set, drive for that many seconds then stop."""
     try:
+        _invalidate_sensor_cache()
         drive_forward(speed, duration)
+        flush_actuators()
         if duration:
             return f"Drove forward at speed {speed} for {duration} seconds"
         else:
             return f"Started driving forward at speed {speed}"
     except Exception as e:
-        return f"Error driving forward: {str(e)}"
+        return _TOOL_ERRORS["driving forward"] + repr(e)
 
 @function_tool
 def drive_backward_tool(speed: int, duration: Optional[float] = None) -> str:
     """Drive backward at given speed (0-100). If duration is set, drive for that many seconds then stop."""
     try:
+        _invalidate_sensor_cache()
         drive_backward(speed, duration)
+        flush_actuators()
         if duration:
             return f"Drove backward at speed {speed} for {duration} seconds"
         else:
             return f"Started driving backward at speed {speed}"
     except Exception as e:
-        return f"Error driving backward: {str(e)}"
+        return _TOOL_ERRORS["driving backward"] + repr(e)
 
 @function_tool
 def stop_tool() -> str:
     """Stop all motors."""
     try:
+        _invalidate_sensor_cache()
         stop()
+        flush_actuators()
         return "Robot stopped"
     except Exception as e:
-        return f"Error stopping robot: {str(e)}"
+        return _TOOL_ERRORS["stopping robot"] + repr(e)
 
 @function_tool
 def turn_left_tool(angle: float, speed: int = 30, duration: Optional[float] = None) -> str:
     """Turn left with steering at given speed (0-100). If duration is set, turn for that many seconds then stop."""
     try:
+        _invalidate_sensor_cache()
         turn_left(angle, speed, duration)
+        flush_actuators()
         if duration:
             return f"Turned left {angle} degrees at speed {speed} for {duration} seconds"
         else:
             return f"Started turning left {angle} degrees at speed {speed}"
     except Exception as e:
-        return f"Error turning left: {str(e)}"
+        return _TOOL_ERRORS["turning left"] + repr(e)
 
 @function_tool
 def turn_right_tool(angle: float, speed: int = 30, duration: Optional[float] = None) -> str:
     """Turn right with steering at given speed (0-100). If duration is set, turn for that many seconds then stop."""
     try:
+        _invalidate_sensor_cache()
         turn_right(angle, speed, duration)
+        flush_actuators()
         if duration:
             return f"Turned right {angle} degrees at speed {speed} for {duration} seconds"
         else:
             return f"Started turning right {angle} degrees at speed {speed}"
     except Exception as e:
-        return f"Error turning right: {str(e)}"
+        return _TOOL_ERRORS["turning right"] + repr(e)
 
 @function_tool
 def get_ultrasound_tool() -> str:
     """Get distance from ultrasonic sensor in centimeters."""
     try:
-        distance = get_ultrasound()
+        distance = _cached_reading("ultrasound", get_ultrasound, 0.1)
         return f"Distance from ultrasonic sensor: {distance} cm"
     except Exception as e:
-        return f"Error getting ultrasound distance: {str(e)}"
+        return _TOOL_ERRORS["getting ultrasound distance"] + repr(e)
 
 @function_tool
 def get_grayscale_tool() -> str:
     """Get grayscale sensor readings."""
     try:
-        readings = get_grayscale()
+        readings = _cached_reading("grayscale", get_grayscale, 0.1)
         return f"Grayscale sensor readings: {readings}"
     except Exception as e:
-        return f"Error getting grayscale readings: {str(e)}"
+        return _TOOL_ERRORS["getting grayscale readings"] + repr(e)
 
 @function_tool
 def capture_image_tool(filename: str = "capture.jpg") -> str:
@@ -162,7 +301,7 @@ def capture_image_tool(filename: str = "capture.jpg") -> str:
         capture_image(filename)
         return f"Image captured and saved as {filename}"
     except Exception as e:
-        return f"Error capturing image: {str(e)}"
+        return _TOOL_ERRORS["capturing image"] + repr(e)
 
 @function_tool
 def analyze_image_tool(image_path: str, analysis_prompt: str = "Analyze this image and describe what you see") -> str:
@@ -201,7 +340,7 @@ For detailed visual analysis, you can use the 'see' command to take a new photo
         return analysis
         
     except Exception as e:
-        return f"Error analyzing image: {str(e)}"
+        return _TOOL_ERRORS["analyzing image"] + repr(e)
 
 
 
@@ -214,32 +353,36 @@ def play_sound_tool(filename: str, volume: int = 50) -> str:
         play_sound(filename, volume)
         return f"Playing sound {filename} at volume {volume}"
     except Exception as e:
-        return f"Error playing sound: {str(e)}"
+        return _TOOL_ERRORS["playing sound"] + repr(e)
+
+def _read_robot_state() -> str:
+    """Read servo angles and sensors and serialize them as the robot state JSON."""
+    servo_angles = get_servo_angles()
+    
+    # Get sensor readings
+    ultrasound_distance = _cached_reading("ultrasound", get_ultrasound, 0.1)
+    grayscale_readings = _cached_reading("grayscale", get_grayscale, 0.1)
+    
+    # Compile robot state
+    robot_state = {
+        "servo_angles": servo_angles,
+        "sensors": {
+            "ultrasound_distance_cm": ultrasound_distance,
+            "grayscale_readings": grayscale_readings
+        },
+        "timestamp": time.time()
+    }
+    
+    return json.dumps(robot_state, indent=2)
 
 @function_tool
 def get_robot_state_tool() -> str:
     """Get the current state of the robot including servo angles and sensor readings."""
     try:
         # Get servo angles
-        servo_angles = get_servo_angles()
-        
-        # Get sensor readings
-        ultrasound_distance = get_ultrasound()
-        grayscale_readings = get_grayscale()
-        
-        # Compile robot state
-        robot_state = {
-            "servo_angles": servo_angles,
-            "sensors": {
-                "ultrasound_distance_cm": ultrasound_distance,
-                "grayscale_readings": grayscale_readings
-            },
-            "timestamp": time.time()
-        }
-        
-        return json.dumps(robot_state, indent=2)
+        return _cached_reading("robot_state", _read_robot_state, 0.2)
     except Exception as e:
-        return f"Error getting robot state: {str(e)}"
+        return _TOOL_ERRORS["getting robot state"] + repr(e)
 
 # ============================================================================
 # PLANNING AND JUDGMENT TOOLS
@@ -268,7 +411,7 @@ def create_plan_tool(task_description: str) -> str:
         
         return f"Plan created for: {task_description}. Use 'check_plan_status' to monitor progress."
     except Exception as e:
-        return f"Error creating plan: {str(e)}"
+        return _TOOL_ERRORS["creating plan"] + repr(e)
 
 @function_tool
 def check_plan_status_tool() -> str:
@@ -313,6 +456,98 @@ def update_plan_progress_tool(step_description: str, completed: bool = True) ->
     
     return f"Plan progress updated. Step {current_step} completed: {step_description}"
 
+# ============================================================================
+# FAST REQUEST CLASSIFICATION
+# ============================================================================
+
+# Requests that fully match this grammar are single actions the orchestrator
+# would always mark IMMEDIATE; anything else goes to the orchestrator
+_NUM = r"\d+(?:\.\d+)?"
+_SPEED = rf"(?: at(?: speed)? {_NUM})?"
+_FOR = rf"(?: for {_NUM} ?(?:seconds?|secs?|s))?"
+_IMMEDIATE_RE = re.compile(
+    r"(?:stop|reset)(?: the (?:robot|car|motors))?"
+    rf"|drive (?:forward|backward|back){_SPEED}{_FOR}"
+    rf"|turn (?:left|right)(?: {_NUM} ?(?:degrees?|deg))?{_SPEED}{_FOR}"
+    r"|(?:take|capture) an? (?:photo|picture|image)"
+)
+# Stems of multi-step wording; a match always sends the request to the orchestrator
+_PLAN_HINTS = ("then", "explor", "navigat", "find", "search", "until", "circl", "around", "follow", "go to", "to the")
+
+def _is_obvious_immediate(user_input: str) -> bool:
+    """Return True if the request is clearly a single immediate action."""
+    lc = user_input.lower().strip().rstrip(".!")
+    if any(hint in lc for hint in _PLAN_HINTS):
+        return False
+    return _IMMEDIATE_RE.fullmatch(lc) is not None
+
+# ============================================================================
+# MEMORY SESSION
+# ============================================================================
+
+class BoundedSQLiteSession(SQLiteSession):
+    """SQLiteSession that only replays the most recent items on each run.
+
+    The stock session loads the entire history every turn, so per-turn
+    latency grows with the number of stored memories. Capping the read keeps
+    retrieval to a single indexed ``ORDER BY ... LIMIT`` query.
+    """
+    
+    def __init__(self, session_id: str, db_path: str, max_items: int = 200):
+        super().__init__(session_id=session_id, db_path=db_path)
+        self.max_items = max_items
+        self._pending = None  # items held back while a batch() is open
+    
+    def _get_connection(self):
+        # Reuse one tuned connection per thread and database file across sessions
+        if str(self.db_path) == ":memory:":
+            return super()._get_connection()
+        return get_sqlite_connection(str(self.db_path))
+    
+    @contextmanager
+    def batch(self):
+        """Hold back session writes in this block and commit them in one transaction.
+
+        Runs inside the block still see the held-back items through get_items.
+        Whatever was collected is written on exit, even if the block raised.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        finally:
+            pending, self._pending = self._pending, None
+            if pending:
+                # Write on the shared agent loop: its executor threads keep their
+                # tuned connections, where a private loop would open a new one per flush
+                asyncio.run_coroutine_threadsafe(
+                    super().add_items(pending), get_loop(AGENT_LOOP)
+                ).result()
+    
+    async def add_items(self, items: List[Dict[str, Any]]) -> None:
+        if self._pending is not None:
+            self._pending.extend(items)
+            return
+        await super().add_items(items)
+    
+    async def pop_item(self) -> Optional[Dict[str, Any]]:
+        if self._pending:
+            return self._pending.pop()
+        return await super().pop_item()
+    
+    async def get_items(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        limit = self.max_items if limit is None else limit
+        items = await super().get_items(limit)
+        if self._pending:
+            items = (items + self._pending)[-limit:]
+        # Drop tool outputs whose originating call fell outside the window
+        start = 0
+        while start < len(items) and items[start].get("type") == "function_call_output":
+            start += 1
+        return items[start:]
+
 # ============================================================================
 # AGENT CLASSES
 # ============================================================================
@@ -322,7 +557,11 @@ class PicarXSmartAgent:
     
     def __init__(self, session_id: str = "picarx_smart"):
         self.session_id = session_id
-        self.session = SQLiteSession(
+        self._capture_path = "_last_capture.jpg"
+        # Exception behind the last failed capture_and_analyze_image, None after a success
+        self.last_analysis_error = None
+        
+        self.session = BoundedSQLiteSession(
             session_id=session_id,
             db_path="picarx_smart_memory.db"
         )
@@ -505,77 +744,87 @@ Be careful with movement commands and always consider safety. Use appropriate sp
     def process_request(self, user_input: str) -> str:
         """Process a user request using the orchestrator-judge pattern."""
         try:
-            # Step 1: Orchestrator decides whether to act or plan
-            print("🤖 Orchestrator analyzing request...")
-            orchestrator_result = Runner.run_sync(
-                self.orchestrator, 
-                user_input, 
-                session=self.session
-            )
+            # Simple single-step commands skip the orchestrator round-trip
+            if _is_obvious_immediate(user_input):
+                logger.info("⚡ Fast path: treating request as immediate")
+                return self._run_immediate(user_input)
             
-            decision = orchestrator_result.final_output.strip()
-            print(f"🎯 Orchestrator decision: {decision}")
-            print(f"🔍 Decision starts with IMMEDIATE: {decision.startswith('IMMEDIATE:')}")
-            print(f"🔍 Decision starts with NEEDS PLAN: {decision.startswith('NEEDS PLAN:')}")
-            
-            # Step 2: Execute based on decision
-            if decision.startswith("IMMEDIATE:"):
-                # Execute immediately
-                action_description = decision[10:].strip()
-                print(f"⚡ Executing immediate action: {action_description}")
-                
-                # Check if this is an image analysis request
-                if "analyze" in action_description.lower() and ("image" in action_description.lower() or "photo" in action_description.lower()):
-                    print("📸 Detected image analysis request, using capture_and_analyze_image method...")
-                    result = self.capture_and_analyze_image("Analyze this image and describe what you see")
-                    return f"✅ Image Analysis Completed: {result}"
-                
-                # Execute the action using the action agent
-                result = Runner.run_sync(
-                    self.action_agent,
-                    action_description,
-                    session=self.session
-                )
-                
-                return f"✅ Action completed: {result.final_output}"
-                
-            elif decision.startswith("NEEDS PLAN:"):
-                # Create and execute plan
-                task_description = decision[11:].strip()
-                print(f"📋 Creating plan for: {task_description}")
-                
-                # Create the plan
-                plan_result = Runner.run_sync(
-                    self.action_agent,
-                    f"Create a plan for: {task_description}",
+            # Commit the orchestrator and follow-up runs as a single session write
+            with self.session.batch():
+                # Step 1: Orchestrator decides whether to act or plan
+                logger.info("🤖 Orchestrator analyzing request...")
+                orchestrator_result = run_sync(
+                    self.orchestrator, 
+                    user_input, 
                     session=self.session
                 )
                 
-                print(f"📋 Plan created: {plan_result.final_output}")
+                decision = orchestrator_result.final_output.strip()
+                logger.info("🎯 Orchestrator decision: %s", decision)
                 
-                # Start executing the plan with continuous monitoring
-                print(f"🚀 Starting plan execution with continuous monitoring...")
-                execution_result = self.execute_plan_with_monitoring(task_description)
-                
-                return f"📋 Plan created for: {task_description}\n\n🚀 Plan Execution:\n{execution_result}"
+                # Step 2: Execute based on decision
+                if (action_description := decision.removeprefix("IMMEDIATE:")) != decision:
+                    # Execute immediately
+                    return self._run_immediate(action_description.strip())
+                    
+                elif (task_description := decision.removeprefix("NEEDS PLAN:")) != decision:
+                    # Create and execute plan
+                    task_description = task_description.strip()
+                    logger.info("📋 Creating plan for: %s", task_description)
+                    
+                    # Create the plan
+                    plan_result = run_sync(
+                        self.action_agent,
+                        f"Create a plan for: {task_description}",
+                        session=self.session
+                    )
+                    
+                    logger.info("📋 Plan created: %s", plan_result.final_output)
+                    
+                else:
+                    # Fallback to action agent
+                    logger.info("🔄 Fallback to action agent...")
+                    result = run_sync(
+                        self.action_agent,
+                        user_input,
+                        session=self.session
+                    )
+                    return result.final_output
                 
-            else:
-                # Fallback to action agent
-                print("🔄 Fallback to action agent...")
-                result = Runner.run_sync(
-                    self.action_agent,
-                    user_input,
-                    session=self.session
-                )
-                return result.final_output
+            # Start executing the plan with continuous monitoring. This runs
+            # outside the batch because its state probe writes from a worker thread.
+            logger.info("🚀 Starting plan execution with continuous monitoring...")
+            execution_result = self.execute_plan_with_monitoring(task_description)
+            
+            return f"📋 Plan created for: {task_description}\n\n🚀 Plan Execution:\n{execution_result}"
                 
         except Exception as e:
             return f"❌ Error processing request: {str(e)}"
     
+    def _run_immediate(self, action_description: str) -> str:
+        """Execute a simple command right away with the action agent."""
+        logger.info("⚡ Executing immediate action: %s", action_description)
+        
+        # Check if this is an image analysis request
+        lowered = action_description.lower()
+        if "analy" in lowered and ("image" in lowered or "photo" in lowered or "picture" in lowered):
+            logger.info("📸 Detected image analysis request, using capture_and_analyze_image method...")
+            result = self.capture_and_analyze_image("Analyze this image and describe what you see")
+            return f"✅ Image Analysis Completed: {result}"
+        
+        # Execute the action using the action agent
+        result = run_sync(
+            self.action_agent,
+            action_description,
+            session=self.session
+        )
+        
+        return f"✅ Action completed: {result.final_output}"
+    
     def check_plan_progress(self) -> str:
         """Check the current plan progress using the judge agent."""
         try:
-            result = Runner.run_sync(
+            result = run_sync(
                 self.judge,
                 "Analyze the current plan status and provide guidance on what should happen next",
                 session=self.session
@@ -587,19 +836,20 @@ Be careful with movement commands and always consider safety. Use appropriate sp
     def execute_plan_step(self, step_description: str) -> str:
         """Execute a specific plan step."""
         try:
-            # Update progress
-            progress_result = Runner.run_sync(
-                self.judge,
-                f"Update plan progress: {step_description}",
-                session=self.session
-            )
-            
-            # Execute the step
-            action_result = Runner.run_sync(
-                self.action_agent,
-                step_description,
-                session=self.session
-            )
+            with self.session.batch():
+                # Update progress
+                progress_result = run_sync(
+                    self.judge,
+                    f"Update plan progress: {step_description}",
+                    session=self.session
+                )
+                
+                # Execute the step
+                action_result = run_sync(
+                    self.action_agent,
+                    step_description,
+                    session=self.session
+                )
             
             return f"📋 Step executed: {action_result.final_output}"
             
@@ -609,173 +859,184 @@ Be careful with movement commands and always consider safety. Use appropriate sp
     def execute_plan_with_monitoring(self, task_description: str) -> str:
         """Execute a plan with continuous monitoring, taking photos and using tools to verify progress."""
         try:
-            print(f"🚀 Starting plan execution with continuous monitoring for: {task_description}")
+            logger.info("🚀 Starting plan execution with continuous monitoring for: %s", task_description)
             
-            # Step 1: Take initial photo to understand current state
-            print("📸 Step 1: Taking initial photo to understand current state...")
-            initial_analysis = self.capture_and_analyze_image(f"Analyze this image to understand the current environment for the task: {task_description}")
-            print(f"📸 Initial analysis: {initial_analysis}")
+            # Steps 1 and 2 are independent network-bound calls, so overlap them.
+            # The photo analysis runs without the session, so only the state
+            # probe writes to memory.
+            logger.info("📸 Step 1: Taking initial photo to understand current state...")
+            analysis_future = _executor.submit(
+                self.capture_and_analyze_image,
+                f"Analyze this image to understand the current environment for the task: {task_description}"
+            )
+            logger.info("🤖 Step 2: Getting current robot state...")
+            state_future = _executor.submit(self.get_current_robot_state)
             
-            # Step 2: Get current robot state
-            print("🤖 Step 2: Getting current robot state...")
-            current_state = self.get_current_robot_state()
-            print(f"🤖 Current robot state: {current_state}")
+            initial_analysis = analysis_future.result()
+            logger.info("📸 Initial analysis: %s", initial_analysis)
+            current_state = state_future.result()
+            logger.info("🤖 Current robot state: %s", current_state)
             
             # Step 3: Start executing the plan step by step
-            print("📋 Step 3: Starting plan execution...")
+            logger.info("📋 Step 3: Starting plan execution...")
             
             # All tasks use the intelligent adaptive planning approach
-            print("🧠 Using intelligent adaptive planning approach...")
+            logger.info("🧠 Using intelligent adaptive planning approach...")
             return self.execute_adaptive_plan(task_description)
             
         except Exception as e:
             error_msg = f"❌ Error in plan execution: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
     
     def execute_adaptive_plan(self, task_description: str) -> str:
         """Execute ANY task using intelligent adaptive planning based on visual feedback."""
         try:
-            print("🧠 Executing intelligent adaptive plan...")
-            print(f"🎯 Task: {task_description}")
-            print("🎯 Strategy: Use iterative photo analysis to adaptively plan and execute any task")
+            logger.info("🧠 Executing intelligent adaptive plan...")
+            logger.info("🎯 Task: %s", task_description)
+            logger.info("🎯 Strategy: Use iterative photo analysis to adaptively plan and execute any task")
             
             max_iterations = 20  # Allow more iterations for complex tasks
             iteration = 0
+            consecutive_failures = 0
+            deadline = time.monotonic() + _ADAPTIVE_PLAN_BUDGET_S
             
             while iteration < max_iterations:
+                if time.monotonic() > deadline:
+                    logger.warning("⏱️ Adaptive plan budget of %.0fs used up", _ADAPTIVE_PLAN_BUDGET_S)
+                    return f"⚠️ Task execution stopped after {iteration} iterations: time budget of {_ADAPTIVE_PLAN_BUDGET_S:.0f}s exhausted."
                 iteration += 1
-                print(f"\n🔄 === ITERATION {iteration}/{max_iterations} ===")
+                logger.info("\n🔄 === ITERATION %s/%s ===", iteration, max_iterations)
                 
                 # Step 1: Take photo and analyze current situation
-                print("📸 Taking photo to analyze current situation...")
-                analysis_prompt = f"""Analyze this image to help the robot complete this task: "{task_description}"
-
-Based on what you see, determine:
-1. What is the robot's current situation relative to the task goal?
-2. What should the robot do next to make progress?
-3. What direction should it move (left, right, forward, backward, or stay still)?
-4. How far should it move (small adjustment, medium movement, large movement, or no movement)?
-5. Are there any obstacles or safety concerns?
-
-Provide your analysis in this format:
-SITUATION: [describe current state]
-NEXT_ACTION: [what the robot should do]
-DIRECTION: [left/right/forward/backward/stay]
-DISTANCE: [small/medium/large/none]
-OBSTACLES: [describe any obstacles]
-REASONING: [explain your recommendation]
-PROGRESS: [how much progress toward the goal]"""
+                logger.info("📸 Taking photo to analyze current situation...")
+                analysis_prompt = ADAPTIVE_PLAN_PROMPT.format(task=task_description)
+                if iteration >= 10:
+                    # Fold the late-run reassessment into this call instead of a second round trip
+                    analysis_prompt += "\n\nThe robot has already made several moves: in PROGRESS, also state whether it is getting closer to the goal or needs a different approach."
+                
+                situation_analysis = self.capture_and_analyze_image(analysis_prompt, run_config=PLAN_RUN_CONFIG)
+                logger.info("📸 Situation analysis received: %s", situation_analysis)
                 
-                situation_analysis = self.capture_and_analyze_image(analysis_prompt)
-                print(f"📸 Situation analysis received: {situation_analysis}")
+                if situation_analysis.startswith("❌"):
+                    if isinstance(self.last_analysis_error, _NON_RETRYABLE_ERRORS):
+                        return f"❌ Adaptive plan stopped: {situation_analysis}"
+                    # Don't drive on a failed analysis; back off with jitter before asking again
+                    consecutive_failures += 1
+                    backoff = min(_ADAPTIVE_MAX_BACKOFF_S, _ADAPTIVE_SETTLE_S * (1.5 ** consecutive_failures))
+                    backoff += random.uniform(0, 0.1 * backoff)
+                    logger.warning("⚠️ Analysis failed (%s in a row), retrying in %.1fs", consecutive_failures, backoff)
+                    time.sleep(backoff)
+                    continue
+                consecutive_failures = 0
                 
                 # Step 2: Extract action instructions from analysis
-                print("🧠 Extracting action instructions from analysis...")
+                logger.info("🧠 Extracting action instructions from analysis...")
                 action_plan = self._extract_action_plan(situation_analysis)
-                print(f"🧠 Action plan: {action_plan}")
+                logger.info("🧠 Action plan: %s", action_plan)
+                
+                # Lowercase once; the completion and movement checks below all scan this
+                analysis_lower = situation_analysis.lower()
                 
                 # Step 3: Check if task is complete based on analysis
-                if "human" in situation_analysis.lower() and ("found" in situation_analysis.lower() or "detected" in situation_analysis.lower()):
-                    print("✅ Human detected in analysis!")
+                if "human" in analysis_lower and ("found" in analysis_lower or "detected" in analysis_lower):
+                    logger.info("✅ Human detected in analysis!")
                     final_analysis = self.capture_and_analyze_image(f"Analyze this image to confirm the task '{task_description}' has been successfully completed")
                     return f"🎯 Task completed successfully!\n\n📸 Final confirmation:\n{final_analysis}"
                 
-                # Safety check: if we've moved several times without valid ultrasound, use visual estimation
+                # Safety check: after several moves, report the reassessment carried in PROGRESS
                 if iteration >= 10:
-                    print("⚠️ Multiple iterations completed - taking final assessment...")
-                    reassessment = self.capture_and_analyze_image(f"Analyze this image to determine if the robot has made progress toward the task '{task_description}' or if we need a different approach")
-                    print(f"🔄 Reassessment: {reassessment}")
+                    logger.warning("⚠️ Multiple iterations completed - checking reassessment...")
+                    logger.info("🔄 Reassessment: %s", action_plan.get('progress', 'not reported'))
                 
                 # Step 4: Execute movement based on analysis
-                print("🚶 Executing movement based on analysis...")
+                logger.info("🚶 Executing movement based on analysis...")
                 
                 # Use the analysis to determine movement
-                if "forward" in situation_analysis.lower():
-                    print("⬆️ Moving forward based on analysis...")
+                if "forward" in analysis_lower:
+                    logger.info("⬆️ Moving forward based on analysis...")
                     try:
                         drive_forward(30, 0.5)
                         stop()
-                        print("⏹️ Stopped")
+                        logger.info("⏹️ Stopped")
                     except Exception as e:
-                        print(f"⚠️ Movement error: {e}")
-                elif "left" in situation_analysis.lower():
-                    print("⬅️ Moving left based on analysis...")
+                        logger.warning("⚠️ Movement error: %s", e)
+                elif "left" in analysis_lower:
+                    logger.info("⬅️ Moving left based on analysis...")
                     try:
                         set_dir_servo(-20)
                         drive_forward(25, 0.4)
                         set_dir_servo(0)
                         stop()
-                        print("⏹️ Stopped")
+                        logger.info("⏹️ Stopped")
                     except Exception as e:
-                        print(f"⚠️ Movement error: {e}")
-                elif "right" in situation_analysis.lower():
-                    print("➡️ Moving right based on analysis...")
+                        logger.warning("⚠️ Movement error: %s", e)
+                elif "right" in analysis_lower:
+                    logger.info("➡️ Moving right based on analysis...")
                     try:
                         set_dir_servo(20)
                         drive_forward(25, 0.4)
                         set_dir_servo(0)
                         stop()
-                        print("⏹️ Stopped")
+                        logger.info("⏹️ Stopped")
                     except Exception as e:
-                        print(f"⚠️ Movement error: {e}")
+                        logger.warning("⚠️ Movement error: %s", e)
                 else:
-                    print("🔄 Making small forward movement to explore...")
+                    logger.info("🔄 Making small forward movement to explore...")
                     try:
                         drive_forward(20, 0.3)
                         stop()
-                        print("⏹️ Stopped")
+                        logger.info("⏹️ Stopped")
                     except Exception as e:
-                        print(f"⚠️ Movement error: {e}")
+                        logger.warning("⚠️ Movement error: %s", e)
                 
                 # Step 5: Wait for movement to settle and assess
-                print("⏳ Waiting for movement to settle...")
-                import time
-                time.sleep(1.5)
+                logger.info("⏳ Waiting for movement to settle...")
+                time.sleep(_ADAPTIVE_SETTLE_S)
                 
-                print(f"✅ Iteration {iteration} completed")
+                logger.info("✅ Iteration %s completed", iteration)
             
             return f"⚠️ Task execution completed after {max_iterations} iterations. Final status may not be exactly as expected."
             
         except Exception as e:
             error_msg = f"❌ Error in adaptive plan execution: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
     
     def execute_general_plan(self, task_description: str) -> str:
         """Execute a general plan using the judge and action agents."""
         try:
-            print(f"📋 Executing general plan for: {task_description}")
+            logger.info("📋 Executing general plan for: %s", task_description)
             
             # Get plan guidance from judge
-            guidance = Runner.run_sync(
+            guidance = run_sync(
                 self.judge,
                 f"Provide step-by-step guidance for executing: {task_description}",
                 session=self.session
             )
             
-            print(f"📋 Judge guidance: {guidance.final_output}")
+            logger.info("📋 Judge guidance: %s", guidance.final_output)
             
             # Execute the guidance
-            result = Runner.run_sync(
+            result = run_sync(
                 self.action_agent,
                 guidance.final_output,
                 session=self.session
             )
             
-            print(f"📋 Action agent result: {result.final_output}")
+            logger.info("📋 Action agent result: %s", result.final_output)
             
             return f"📋 General plan executed:\n{result.final_output}"
             
         except Exception as e:
             error_msg = f"❌ Error in general plan execution: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
     
     def get_current_robot_state(self) -> str:
         """Get the current robot state including servo angles and sensor readings."""
         try:
-            result = Runner.run_sync(
+            result = run_sync(
                 self.action_agent,
                 "Get the current robot state including servo angles and sensor readings",
                 session=self.session
@@ -784,153 +1045,155 @@ PROGRESS: [how much progress toward the goal]"""
         except Exception as e:
             return f"❌ Error getting robot state: {str(e)}"
     
-    def capture_and_analyze_image(self, context: str = "Analyze this image and describe what you see") -> str:
+    def capture_and_analyze_image(self, context: str = "Analyze this image and describe what you see", run_config: RunConfig = RUN_CONFIG) -> str:
         """Capture an image and immediately send it to the action agent for analysis with context."""
+        self.last_analysis_error = None
         try:
-            print("🔍 Starting image capture and analysis process...")
-            print(f"📝 Context provided: {context}")
-            
-            # Step 1: Capture the image using the capture_image function directly
-            filename = f"capture_{int(time.time())}.jpg"
-            print(f"📸 Step 1: Capturing image as '{filename}'...")
-            try:
-                capture_image(filename)
-                print(f"✅ Image captured successfully as '{filename}'")
-            except Exception as e:
-                error_msg = f"❌ Error capturing image: {str(e)}"
-                print(error_msg)
-                return error_msg
+            logger.info("🔍 Starting image capture and analysis process...")
+            logger.info("📝 Context provided: %s", context)
             
-            # Step 2: Read and encode the image
-            print(f"📁 Step 2: Reading and encoding image file...")
-            if not os.path.exists(filename):
-                error_msg = f"❌ Error: Image file '{filename}' not found after capture!"
-                print(error_msg)
-                return error_msg
+            import base64  # deferred: only needed on the vision path
             
-            print(f"📖 Reading image file: {filename}")
-            with open(filename, "rb") as image_file:
-                image_data = image_file.read()
-                file_size = len(image_data)
-                print(f"📊 Image file size: {file_size} bytes ({file_size/1024:.1f} KB)")
-                base64_image = base64.b64encode(image_data).decode("utf-8")
-                print(f"🔢 Base64 encoding completed. Length: {len(base64_image)} characters")
+            # Step 1: Grab the current frame as JPEG bytes straight from the camera buffer,
+            # capped in size and quality to keep the upload small
+            logger.info("📸 Step 1: Capturing image from camera buffer...")
+            jpeg = capture_image_bytes(quality=_VISION_JPEG_QUALITY, max_edge=_VISION_MAX_EDGE)
+            if jpeg is not None:
+                # Step 2: Encode the in-memory JPEG
+                logger.info("📊 Image size: %s bytes (%.1f KB)", len(jpeg), len(jpeg) / 1024)
+                base64_image = base64.b64encode(jpeg).decode("ascii")
+                logger.info("🔢 Base64 encoding completed. Length: %s characters", len(base64_image))
+            else:
+                # Fall back to capturing through a file
+                base64_image, error_msg = self._capture_file_as_base64()
+                if error_msg:
+                    return error_msg
             
             # Step 3: Create message with image and context for the action agent
-            print(f"📝 Step 3: Creating message for GPT-4o vision analysis...")
+            logger.info("📝 Step 3: Creating message for GPT-4o vision analysis...")
             messages = [
                 {
                     "role": "user",
                     "content": [
-                        {
-                            "type": "input_text",
-                            "text": f"Context: {context}\n\nPlease analyze this image and provide a detailed description of what you see, including any relevant observations for robot navigation or task completion."
-                        },
-                        {
-                            "type": "input_image",
-                            "image_url": f"data:image/jpeg;base64,{base64_image}"
-                        }
+                        {"type": "input_text", "text": f"{IMAGE_ANALYSIS_PROMPT}\n\nContext: {context}"},
+                        {"type": "input_image", "image_url": _JPEG_DATA_URL_PREFIX + base64_image}
                     ]
                 }
             ]
-            print(f"📤 Message created with:")
-            print(f"   - Text content: {messages[0]['content'][0]['text']}")
-            print(f"   - Image content: data:image/jpeg;base64,[{len(base64_image)} chars]")
+            logger.debug("📤 Message created with:")
+            logger.debug("   - Text content: %s", messages[0]['content'][0]['text'])
+            logger.debug("   - Image content: %s[%s chars]", _JPEG_DATA_URL_PREFIX, len(base64_image))
             
             # Step 4: Send to action agent for analysis
-            print(f"🚀 Step 4: Sending to GPT-4o vision model via action agent...")
-            print(f"⏳ Waiting for GPT-4o vision analysis...")
+            logger.info("🚀 Step 4: Sending to GPT-4o vision model via action agent...")
+            logger.info("⏳ Waiting for GPT-4o vision analysis...")
             
             # Note: We must set session=None when sending a list of messages
             # The session memory will still work for subsequent string inputs
-            result = Runner.run_sync(
+            result = run_sync(
                 self.action_agent,
                 messages,
-                session=None  # Must be None when sending message list
+                session=None,  # Must be None when sending message list
+                run_config=run_config
             )
             
-            print(f"🎯 GPT-4o Vision Analysis Complete!")
-            print(f"📋 Raw result object type: {type(result)}")
-            print(f"📋 Raw result attributes: {dir(result)}")
-            print(f"📋 Final output type: {type(result.final_output)}")
-            print(f"📋 Final output length: {len(str(result.final_output))} characters")
-            print(f"📋 Final output content:")
-            print("=" * 80)
-            print(result.final_output)
-            print("=" * 80)
+            logger.info("🎯 GPT-4o Vision Analysis Complete!")
+            logger.debug("📋 Raw result object type: %s", type(result))
+            logger.debug("📋 Raw result attributes: %s", dir(result))
+            logger.debug("📋 Final output type: %s", type(result.final_output))
+            logger.debug("📋 Final output length: %s characters", len(str(result.final_output)))
+            logger.info("📋 Final output content:")
+            logger.info("=" * 80)
+            logger.info("%s", result.final_output)
+            logger.info("=" * 80)
             
             return f"✅ Image Analysis Complete:\n\n{result.final_output}"
             
         except Exception as e:
+            self.last_analysis_error = e
             error_msg = f"❌ Error in capture and analyze: {str(e)}"
-            print(error_msg)
-            print(f"🔍 Exception type: {type(e)}")
-            print(f"🔍 Exception details: {str(e)}")
+            logger.error(error_msg)
+            logger.debug("🔍 Exception type: %s", type(e))
+            logger.debug("🔍 Exception details: %s", str(e))
             return error_msg
 
+    def _capture_file_as_base64(self):
+        """Capture to the reusable capture file and return (base64_image, error_msg)."""
+        import base64
+        import mmap
+        
+        # The same file is overwritten each time so captures don't pile up on the SD card.
+        filename = self._capture_path
+        logger.info("📸 Capturing image as '%s'...", filename)
+        try:
+            captured = capture_image(filename)
+        except Exception as e:
+            error_msg = f"❌ Error capturing image: {str(e)}"
+            logger.error(error_msg)
+            return None, error_msg
+        if not captured:
+            error_msg = f"❌ Error: Image could not be captured to '{filename}'!"
+            logger.error(error_msg)
+            return None, error_msg
+        logger.info("✅ Image captured successfully as '%s'", filename)
+        
+        logger.info("📖 Reading image file: %s", filename)
+        with open(filename, "rb") as image_file:
+            file_size = os.fstat(image_file.fileno()).st_size
+            logger.info("📊 Image file size: %s bytes (%.1f KB)", file_size, file_size / 1024)
+            if file_size == 0:
+                error_msg = f"❌ Error: Image file '{filename}' is empty!"
+                logger.error(error_msg)
+                return None, error_msg
+            # Encode straight from the page cache rather than a read() copy
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                base64_image = base64.b64encode(mapped).decode("ascii")
+        logger.info("🔢 Base64 encoding completed. Length: %s characters", len(base64_image))
+        return base64_image, None
+    
     def _extract_action_plan(self, analysis_text: str) -> dict:
         """Extract action instructions from GPT-4o analysis text."""
         try:
             # Look for the structured format we requested
-            lines = analysis_text.split('\n')
             action_plan = {}
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith('SITUATION:'):
-                    situation = line.split(':', 1)[1].strip()
-                    action_plan['situation'] = situation
-                elif line.startswith('NEXT_ACTION:'):
-                    next_action = line.split(':', 1)[1].strip()
-                    action_plan['next_action'] = next_action
-                elif line.startswith('DIRECTION:'):
-                    direction = line.split(':', 1)[1].strip().lower()
-                    if direction in ['left', 'right', 'forward', 'backward', 'stay']:
-                        action_plan['direction'] = direction
-                elif line.startswith('DISTANCE:'):
-                    distance = line.split(':', 1)[1].strip().lower()
-                    if distance in ['small', 'medium', 'large', 'none']:
-                        action_plan['distance'] = distance
-                elif line.startswith('OBSTACLES:'):
-                    obstacles = line.split(':', 1)[1].strip()
-                    action_plan['obstacles'] = obstacles
-                elif line.startswith('REASONING:'):
-                    reasoning = line.split(':', 1)[1].strip()
-                    action_plan['reasoning'] = reasoning
-                elif line.startswith('PROGRESS:'):
-                    progress = line.split(':', 1)[1].strip()
-                    action_plan['progress'] = progress
+            for field, value in _KV_RE.findall(analysis_text):
+                spec = _ACTION_PLAN_FIELDS.get(field)
+                if spec is not None:
+                    value = spec[1](value.strip())
+                    if value is not None:
+                        action_plan[spec[0]] = value
             
             # If we couldn't parse the structured format, try to infer from the text
+            text_lower = analysis_text.lower()
             if not action_plan.get('direction'):
-                if 'left' in analysis_text.lower():
+                if 'left' in text_lower:
                     action_plan['direction'] = 'left'
-                elif 'right' in analysis_text.lower():
+                elif 'right' in text_lower:
                     action_plan['direction'] = 'right'
-                elif 'forward' in analysis_text.lower() or 'ahead' in analysis_text.lower():
+                elif 'forward' in text_lower or 'ahead' in text_lower:
                     action_plan['direction'] = 'forward'
-                elif 'backward' in analysis_text.lower() or 'back' in analysis_text.lower():
+                elif 'backward' in text_lower or 'back' in text_lower:
                     action_plan['direction'] = 'backward'
-                elif 'stay' in analysis_text.lower() or 'wait' in analysis_text.lower():
+                elif 'stay' in text_lower or 'wait' in text_lower:
                     action_plan['direction'] = 'stay'
                 else:
                     action_plan['direction'] = 'forward'  # Default
             
             if not action_plan.get('distance'):
-                if 'small' in analysis_text.lower() or 'adjust' in analysis_text.lower():
+                if 'small' in text_lower or 'adjust' in text_lower:
                     action_plan['distance'] = 'small'
-                elif 'large' in analysis_text.lower() or 'far' in analysis_text.lower():
+                elif 'large' in text_lower or 'far' in text_lower:
                     action_plan['distance'] = 'large'
-                elif 'none' in analysis_text.lower() or 'stay' in analysis_text.lower():
+                elif 'none' in text_lower or 'stay' in text_lower:
                     action_plan['distance'] = 'none'
                 else:
                     action_plan['distance'] = 'medium'  # Default
             
-            print(f"🧠 Parsed action plan: {action_plan}")
+            logger.info("🧠 Parsed action plan: %s", action_plan)
             return action_plan
             
         except Exception as e:
-            print(f"⚠️ Error parsing action plan: {e}")
+            logger.warning("⚠️ Error parsing action plan: %s", e)
             return {"direction": "forward", "distance": "small"}
     
     def _execute_movement(self, movement_plan: dict) -> None:
@@ -950,7 +1213,7 @@ PROGRESS: [how much progress toward the goal]"""
                 speed = 60
                 duration = 1.0
             
-            print(f"🚶 Executing: {direction} movement, {distance} distance (speed: {speed}%, duration: {duration}s)")
+            logger.info("🚶 Executing: %s movement, %s distance (speed: %s%%, duration: %ss)", direction, distance, speed, duration)
             
 
             
@@ -968,17 +1231,78 @@ PROGRESS: [how much progress toward the goal]"""
                 set_dir_servo(0)    # Straighten
             
             stop()
-            print(f"⏹️ Movement completed: {direction} {distance}")
+            logger.info("⏹️ Movement completed: %s %s", direction, distance)
             
         except Exception as e:
-            print(f"❌ Error executing movement: {e}")
+            logger.error("❌ Error executing movement: %s", e)
 
 # ============================================================================
 # MAIN FUNCTION
 # ============================================================================
 
+HELP_BANNER = """Smart Picar-X Agent with Memory initialized!
+Commands:
+  'quit' - Exit
+  'reset' - Reset the robot
+  'state' - Check current robot state (servos, sensors)
+  'capture' - Take a photo
+  'see' - Take photo and describe what you see
+  'analyze [context]' - Take photo and analyze with specific context
+  'status' - Check plan status
+  'progress' - Check plan progress
+  'execute: [step]' - Execute a specific plan step
+  'move to chair' - Navigate to nearest chair using visual feedback (test plan execution)
+  'test circle' - Test adaptive planning with 'go in a circle' task
+  'find human' - Test human finding with 'find a human' task
+Memory enabled - I will remember our conversations!
+--------------------------------------------------
+"""
+
+_STATUS_LABEL = "📊 Plan Status:\n"
+_STATE_LABEL = "🤖 Robot State:\n"
+_PROGRESS_LABEL = "📋 Progress Report:\n"
+_CAPTURE_LABEL = "📸 Photo Capture:\n"
+_SEE_LABEL = "👁️  Photo Analysis:\n"
+_ANALYZE_LABEL = "🔍 Image Analysis:\n"
+_EXECUTE_LABEL = "⚡ Step Execution:\n"
+_CHAIR_LABEL = "🪑 Chair Navigation Mission:\n"
+_CIRCLE_LABEL = "🔄 Circle Test Mission:\n"
+_HUMAN_LABEL = "👤 Human Finding Mission:\n"
+
+# REPL commands matched on the whole lowercased input: command -> (label, handler(agent))
+_EXACT_COMMANDS = {
+    'status': (_STATUS_LABEL, lambda agent: agent.check_plan_progress()),
+    'state': (_STATE_LABEL, lambda agent: agent.get_current_robot_state()),
+    'progress': (_PROGRESS_LABEL, lambda agent: agent.check_plan_progress()),
+    'capture': (_CAPTURE_LABEL, lambda agent: agent.process_request("Take a photo using the camera")),
+    'see': (_SEE_LABEL, lambda agent: agent.capture_and_analyze_image("Take a photo and describe what you see in the image")),
+    'move to chair': (_CHAIR_LABEL, lambda agent: agent.process_request("go to the nearest chair")),
+    'test circle': (_CIRCLE_LABEL, lambda agent: agent.process_request("go in a circle")),
+    'find human': (_HUMAN_LABEL, lambda agent: agent.process_request("find a human")),
+}
+
+# REPL commands taking an argument: (prefix, label, handler(agent, argument))
+_PREFIX_COMMANDS = (
+    ('analyze ', _ANALYZE_LABEL, lambda agent, context: agent.capture_and_analyze_image(context)),
+    ('execute:', _EXECUTE_LABEL, lambda agent, step: agent.execute_plan_step(step)),
+)
+_PREFIXES = tuple(prefix for prefix, _, _ in _PREFIX_COMMANDS)
+
+def _warmup() -> None:
+    """Start the camera and resolve the API host so the first vision request doesn't pay for either."""
+    init_camera()
+    try:
+        socket.getaddrinfo("api.openai.com", 443)
+    except OSError as e:
+        logger.warning("DNS warmup error: %s", e)
+
 def main():
     """Main function to run the smart Picar-X agent."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # '--quiet' hides the agent's progress logging, leaving only results and warnings
+    if '--quiet' in sys.argv[1:]:
+        logger.setLevel(logging.WARNING)
+    
     # Check for API key
     if not OPENAI_API_KEY:
         print("Error: OPENAI_API_KEY not found in keys.py")
@@ -988,71 +1312,31 @@ def main():
     # Initialize the smart agent
     agent = PicarXSmartAgent()
     
-    print("Smart Picar-X Agent with Memory initialized!")
-    print("Commands:")
-    print("  'quit' - Exit")
-    print("  'reset' - Reset the robot")
-    print("  'state' - Check current robot state (servos, sensors)")
-    print("  'capture' - Take a photo")
-    print("  'see' - Take photo and describe what you see")
-    print("  'analyze [context]' - Take photo and analyze with specific context")
-    print("  'status' - Check plan status")
-    print("  'progress' - Check plan progress")
-    print("  'execute: [step]' - Execute a specific plan step")
-    print("  'move to chair' - Navigate to nearest chair using visual feedback (test plan execution)")
-    print("  'test circle' - Test adaptive planning with 'go in a circle' task")
-    print("  'find human' - Test human finding with 'find a human' task")
-    print("Memory enabled - I will remember our conversations!")
-    print("-" * 50)
+    # Warm up the camera and DNS in the background while the banner prints
+    threading.Thread(target=_warmup, daemon=True).start()
+    
+    sys.stdout.write(HELP_BANNER)
     
     try:
         while True:
             # Get user input
             user_input = input("You: ").strip()
             
-            if user_input.lower() == 'quit':
+            cmd = user_input.lower()
+            if cmd == 'quit':
                 break
-            elif user_input.lower() == 'status':
-                result = agent.check_plan_progress()
-                print(f"📊 Plan Status:\n{result}")
-                continue
-            elif user_input.lower() == 'state':
-                result = agent.get_current_robot_state()
-                print(f"🤖 Robot State:\n{result}")
-                continue
-            elif user_input.lower() == 'progress':
-                result = agent.check_plan_progress()
-                print(f"📋 Progress Report:\n{result}")
-                continue
-            elif user_input.lower() == 'capture':
-                result = agent.process_request("Take a photo using the camera")
-                print(f"📸 Photo Capture:\n{result}")
-                continue
-            elif user_input.lower() == 'see':
-                result = agent.capture_and_analyze_image("Take a photo and describe what you see in the image")
-                print(f"👁️  Photo Analysis:\n{result}")
-                continue
-            elif user_input.lower().startswith('analyze '):
-                context = user_input[8:].strip()
-                result = agent.capture_and_analyze_image(context)
-                print(f"🔍 Image Analysis:\n{result}")
-                continue
-            elif user_input.lower().startswith('execute:'):
-                step = user_input[8:].strip()
-                result = agent.execute_plan_step(step)
-                print(f"⚡ Step Execution:\n{result}")
-                continue
-            elif user_input.lower() == 'move to chair':
-                result = agent.process_request("go to the nearest chair")
-                print(f"🪑 Chair Navigation Mission:\n{result}")
-                continue
-            elif user_input.lower() == 'test circle':
-                result = agent.process_request("go in a circle")
-                print(f"🔄 Circle Test Mission:\n{result}")
+            
+            command = _EXACT_COMMANDS.get(cmd)
+            if command is not None:
+                label, handler = command
+                print(label + handler(agent))
                 continue
-            elif user_input.lower() == 'find human':
-                result = agent.process_request("find a human")
-                print(f"👤 Human Finding Mission:\n{result}")
+            
+            if cmd.startswith(_PREFIXES):
+                for prefix, label, handler in _PREFIX_COMMANDS:
+                    if cmd.startswith(prefix):
+                        print(label + handler(agent, user_input[len(prefix):].strip()))
+                        break
                 continue
             
             # Process the request
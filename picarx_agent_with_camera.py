@@ -9,10 +9,25 @@ This version handles the vilib camera initialization correctly.
 import os
 import sys
 import time
+import asyncio
+import socket
+import threading
 from picarx_agent_advanced import create_advanced_agent, execute_long_form_task
 from picarx_primitives import init_camera, close_camera
 from agents import Runner
 
+def _warmup(session) -> None:
+    """Touch the session database and resolve the API host so the first turn starts warm."""
+    try:
+        # Opens the session's connection and pulls its pages into the OS cache
+        asyncio.run(session.get_items(limit=1))
+    except Exception as e:
+        print(f"Session warmup error: {e}")
+    try:
+        socket.getaddrinfo("api.openai.com", 443)
+    except OSError as e:
+        print(f"DNS warmup error: {e}")
+
 def main():
     """Main function with proper camera initialization."""
     print("Initializing Picar-X Agent with Camera...")
@@ -27,6 +42,9 @@ def main():
         print("Creating agent...")
         agent, session = create_advanced_agent()
         
+        # Warm up storage and networking in the background while the banner prints
+        threading.Thread(target=_warmup, args=(session,), daemon=True).start()
+        
         print("=" * 60)
         print("Picar-X Agent with Camera & Memory Ready!")
         print("Commands:")
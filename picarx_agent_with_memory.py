@@ -8,7 +8,7 @@ Compatible with Python 3.9+ and Raspberry Pi.
 import os
 import sys
 from typing import List, Optional, Dict, Any
-from agents import Agent, Runner, SQLiteSession
+from agents import Agent, SQLiteSession
 from agents import function_tool
 import time
 import json
@@ -17,6 +17,11 @@ from pathlib import Path
 # Import the primitives and keys
 from picarx_primitives import *
 from keys import OPENAI_API_KEY
+from openai_pool import run_sync
+from utils import get_sqlite_connection
+
+# Set the environment variable for OpenAI Agents SDK
+os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
 # Session configuration
 SESSION_DB_PATH = "picarx_sessions.db"
@@ -79,20 +84,14 @@ def set_task_goal_tool(goal: str) -> str:
     except Exception as e:
         return f"Error setting task goal: {str(e)}"
 
-class PicarXAgentWithMemory:
-    def __init__(self, session_id: str = DEFAULT_SESSION_ID, db_path: str = SESSION_DB_PATH):
-        """Initialize the Picar-X agent with persistent memory."""
-        # Set the API key
-        os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
-        
-        # Create session for persistent memory
-        self.session = SQLiteSession(
-            session_id=session_id,
-            db_path=db_path
-        )
-        
-        # Create the agent
-        self.agent = Agent(
+# The agent and its tool schemas are identical across sessions, so build them once
+_AGENT_SINGLETON: Optional[Agent] = None
+
+def _get_agent() -> Agent:
+    """Return the shared Picar-X memory agent, building it on first use."""
+    global _AGENT_SINGLETON
+    if _AGENT_SINGLETON is None:
+        _AGENT_SINGLETON = Agent(
             name="Picar-X Robot with Memory",
             instructions="""You are a helpful assistant that controls a SunFounder Picar-X robot with persistent memory.
             
@@ -126,11 +125,33 @@ class PicarXAgentWithMemory:
                 set_task_goal_tool
             ]
         )
+    return _AGENT_SINGLETON
+
+class TunedSQLiteSession(SQLiteSession):
+    """SQLiteSession sharing one WAL-tuned connection per thread and database file."""
+    
+    def _get_connection(self):
+        # Reuse one tuned connection per thread and database file across sessions
+        if str(self.db_path) == ":memory:":
+            return super()._get_connection()
+        return get_sqlite_connection(str(self.db_path))
+
+class PicarXAgentWithMemory:
+    def __init__(self, session_id: str = DEFAULT_SESSION_ID, db_path: str = SESSION_DB_PATH):
+        """Initialize the Picar-X agent with persistent memory."""
+        # Create session for persistent memory
+        self.session = TunedSQLiteSession(
+            session_id=session_id,
+            db_path=db_path
+        )
+        
+        # Reuse the shared agent; only the session is per-instance
+        self.agent = _get_agent()
     
     def chat(self, message: str, max_turns: int = 10) -> str:
         """Send a message to the agent with persistent memory."""
         try:
-            result = Runner.run_sync(
+            result = run_sync(
                 self.agent, 
                 message, 
                 session=self.session,
@@ -149,11 +170,18 @@ class PicarXAgentWithMemory:
         except Exception as e:
             return [{"error": f"Could not retrieve history: {str(e)}"}]
     
+    def switch_session(self, session_id: str, db_path: str = SESSION_DB_PATH) -> None:
+        """Point the agent at a different persistent session."""
+        self.session = TunedSQLiteSession(
+            session_id=session_id,
+            db_path=db_path
+        )
+    
     def clear_memory(self):
         """Clear the session memory (use with caution)."""
         try:
             # Create a new session with the same ID to effectively clear it
-            self.session = SQLiteSession(
+            self.session = TunedSQLiteSession(
                 session_id=self.session.session_id,
                 db_path=SESSION_DB_PATH
             )
@@ -198,7 +226,7 @@ def main():
                 continue
             elif user_input.lower().startswith('new_session '):
                 session_id = user_input.split(' ', 1)[1]
-                agent = PicarXAgentWithMemory(session_id=session_id)
+                agent.switch_session(session_id)
                 print(f"Agent: Started new session: {session_id}")
                 continue
             
@@ -12,8 +12,35 @@ from picarx import Picarx
 from robot_hat import Music
 from robot_hat import Ultrasonic
 import time
+from time import perf_counter
 import os
+import sys
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
+import numpy as np
+
+# The camera stack is optional (e.g. when running off the robot), so import it
+# once here and let the camera functions check _HAS_VILIB
+try:
+    from vilib import Vilib
+    import cv2
+    _HAS_VILIB = True
+except ImportError:
+    Vilib = None
+    cv2 = None
+    _HAS_VILIB = False
+
+# Messages are written straight to stdout, in order with the callers' print output
+logger = logging.getLogger("picarx.primitives")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_log_stream)
 
 # Singleton pattern for hardware objects
 _picarx = None
@@ -31,209 +58,322 @@ def get_music() -> Music:
     return _music
 
 # Servo angle tracking
-_servo_angles = {
-    'dir_servo': 0,      # steering servo
-    'cam_pan': 0,        # camera pan servo
-    'cam_tilt': 0        # camera tilt servo
-}
+_dir_angle = 0       # steering servo
+_pan_angle = 0       # camera pan servo
+_tilt_angle = 0      # camera tilt servo
+
+# --- Actuator Worker ---
+# robot_hat servo and motor writes are blocking I2C/PWM transactions of a few
+# ms each, so they are applied in order from a dedicated thread and callers
+# return as soon as the write is queued.
+_hw_lock = threading.Lock()  # serializes worker writes with sensor reads on the same bus
+
+# Last speed commanded per motor through set_motor_speed; None when unknown
+_last_motor_speed = {1: None, 2: None}
+# Picarx calls that drive both motors behind set_motor_speed's back
+_MOTOR_OVERRIDES = frozenset(('stop', 'forward', 'backward'))
+
+def _forget_written_state(calls) -> None:
+    """Drop the tracked angle or speed for each call in a failed batch, so the next set rewrites it."""
+    global _dir_angle, _pan_angle, _tilt_angle
+    for call, args in calls:
+        method = call.__name__
+        if method == 'set_dir_servo_angle':
+            _dir_angle = None
+        elif method == 'set_cam_pan_angle':
+            _pan_angle = None
+        elif method == 'set_cam_tilt_angle':
+            _tilt_angle = None
+        elif method == 'set_motor_speed':
+            _last_motor_speed[args[0]] = None
+        elif method in _MOTOR_OVERRIDES:
+            _last_motor_speed[1] = _last_motor_speed[2] = None
+
+class ActuatorWorker:
+    """Apply queued Picarx method calls from a dedicated worker thread.
+
+    A failed write is logged, its tracked state is dropped, and the exception
+    is re-raised by the next flush. put never raises it, so a motion primitive
+    is never cut off between queuing a drive and queuing its stop.
+    """
+    
+    def __init__(self):
+        self.q = queue.Queue()
+        self._error = None
+        self._error_lock = threading.Lock()
+        threading.Thread(target=self._consumer, daemon=True).start()
+    
+    def put(self, method: str, *args) -> None:
+        """Enqueue a Picarx method call, e.g. put('forward', 30)."""
+        self.put_all((method, args))
+    
+    def put_all(self, *ops) -> None:
+        """Enqueue (method, args) pairs to be applied back to back under one lock hold."""
+        px = get_picarx()
+        calls = []
+        for method, args in ops:
+            if method in _MOTOR_OVERRIDES:
+                _last_motor_speed[1] = _last_motor_speed[2] = None
+            calls.append((getattr(px, method), args))
+        self.q.put(calls)
+    
+    def flush(self) -> None:
+        """Block until every queued write has been applied, then raise any pending write error."""
+        self.q.join()
+        with self._error_lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+    
+    def _consumer(self) -> None:
+        while True:
+            calls = self.q.get()
+            try:
+                with _hw_lock:
+                    for call, args in calls:
+                        call(*args)
+            except Exception as e:
+                logger.error("Actuator error in %s: %s", call.__name__, e)
+                _forget_written_state(calls)
+                with self._error_lock:
+                    if self._error is None:
+                        self._error = e
+            finally:
+                self.q.task_done()
+
+_actuator = ActuatorWorker()
+
+def flush_actuators() -> None:
+    """Block until every queued servo and motor write has reached the hardware.
+
+    Raises the first write error since the last flush.
+    """
+    _actuator.flush()
+
+def _flush_actuators_at_exit() -> None:
+    try:
+        flush_actuators()
+    except Exception:
+        pass  # already logged by the worker
+
+# The worker is a daemon thread, so drain it at exit or a final stop/center is lost
+atexit.register(_flush_actuators_at_exit)
+
+def _stop_and_center() -> None:
+    """Stop the motors and center the steering in one queued hardware transaction."""
+    global _dir_angle
+    if _dir_angle == 0:
+        _actuator.put('stop')
+        return
+    _actuator.put_all(('stop', ()), ('set_dir_servo_angle', (0,)))
+    _dir_angle = 0
+
+# --- Timing ---
+# time.sleep() on the Pi can overshoot by several ms, so sleep coarsely and
+# spin for the last stretch to stop motors at a precise deadline.
+_SLEEP_PRECISION = 0.016  # below this, sleep() is too coarse to trust
+_SLEEP_MARGIN = 0.010     # leave this much for the final spin
+
+def _precise_sleep_until(deadline: float) -> None:
+    """Block until time.perf_counter() reaches deadline."""
+    while True:
+        remaining = deadline - perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > _SLEEP_PRECISION:
+            time.sleep(remaining - _SLEEP_MARGIN)
 
 # --- Servo and Motor Primitives ---
 def reset() -> None:
     """Reset all servos to 0 and stop the motors."""
-    global _servo_angles
-    px = get_picarx()
-    px.set_dir_servo_angle(0)
-    px.set_cam_pan_angle(0)
-    px.set_cam_tilt_angle(0)
-    px.stop()
-    # Update tracked angles
-    _servo_angles['dir_servo'] = 0
-    _servo_angles['cam_pan'] = 0
-    _servo_angles['cam_tilt'] = 0
+    global _dir_angle, _pan_angle, _tilt_angle
+    _actuator.put('set_dir_servo_angle', 0)
+    _actuator.put('set_cam_pan_angle', 0)
+    _actuator.put('set_cam_tilt_angle', 0)
+    _actuator.put('stop')
+    _actuator.flush()
+    # Update tracked angles; reset always writes so it resyncs the hardware with them
+    _dir_angle = _pan_angle = _tilt_angle = 0
 
 def set_dir_servo(angle: float) -> None:
-    """Set the direction (steering) servo angle (-30 to 30 typical)."""
-    global _servo_angles
-    px = get_picarx()
-    px.set_dir_servo_angle(angle)
-    _servo_angles['dir_servo'] = angle
+    """Set the direction (steering) servo angle (-30 to 30 typical). Skips the write if unchanged."""
+    global _dir_angle
+    if _dir_angle == angle:
+        return
+    _actuator.put('set_dir_servo_angle', angle)
+    _dir_angle = angle
 
 def set_cam_pan_servo(angle: float) -> None:
     """Set the camera pan servo angle (-35 to 35 typical)."""
-    global _servo_angles
-    px = get_picarx()
-    px.set_cam_pan_angle(angle)
-    _servo_angles['cam_pan'] = angle
+    global _pan_angle
+    _actuator.put('set_cam_pan_angle', angle)
+    _pan_angle = angle
 
 def set_cam_tilt_servo(angle: float) -> None:
     """Set the camera tilt servo angle (-35 to 35 typical)."""
-    global _servo_angles
-    px = get_picarx()
-    px.set_cam_tilt_angle(angle)
-    _servo_angles['cam_tilt'] = angle
+    global _tilt_angle
+    _actuator.put('set_cam_tilt_angle', angle)
+    _tilt_angle = angle
 
 def get_servo_angles() -> dict:
-    """Get current angles of all servos."""
-    global _servo_angles
-    return _servo_angles.copy()
+    """Get current angles of all servos; None for a servo whose last write failed."""
+    return {'dir_servo': _dir_angle, 'cam_pan': _pan_angle, 'cam_tilt': _tilt_angle}
 
 def get_dir_servo_angle() -> float:
     """Get current steering servo angle."""
-    global _servo_angles
-    return _servo_angles['dir_servo']
+    return _dir_angle
 
 def get_cam_pan_angle() -> float:
     """Get current camera pan servo angle."""
-    global _servo_angles
-    return _servo_angles['cam_pan']
+    return _pan_angle
 
 def get_cam_tilt_angle() -> float:
     """Get current camera tilt servo angle."""
-    global _servo_angles
-    return _servo_angles['cam_tilt']
+    return _tilt_angle
 
 def set_motor_speed(motor_id: int, speed: int) -> None:
     """
     Set the speed of an individual motor.
     motor_id: 1 (left), 2 (right)
     speed: -100 to 100
+    Skips the write if the motor was last set to the same speed.
     """
-    px = get_picarx()
-    px.set_motor_speed(motor_id, speed)
+    if _last_motor_speed.get(motor_id) == speed:
+        return
+    _actuator.put('set_motor_speed', motor_id, speed)
+    _last_motor_speed[motor_id] = speed
+
+def _set_both_motors(left: int, right: int) -> None:
+    """Set both motor speeds as one queued hardware transaction, skipping unchanged motors."""
+    ops = []
+    if _last_motor_speed[1] != left:
+        ops.append(('set_motor_speed', (1, left)))
+    if _last_motor_speed[2] != right:
+        ops.append(('set_motor_speed', (2, right)))
+    if ops:
+        _actuator.put_all(*ops)
+        _last_motor_speed[1] = left
+        _last_motor_speed[2] = right
 
 # --- Motor Functions ---
 def drive_forward(speed: int, duration: Optional[float] = None) -> None:
     """Drive forward at given speed (0-100). If duration is set, drive for that many seconds then stop."""
-    px = get_picarx()
-    px.forward(speed)
+    _actuator.put('forward', speed)
     if duration is not None:
-        time.sleep(duration)
-        px.stop()
+        _precise_sleep_until(perf_counter() + duration)
+        _actuator.put('stop')
 
 def drive_backward(speed: int, duration: Optional[float] = None) -> None:
     """Drive backward at given speed (0-100). If duration is set, drive for that many seconds then stop."""
-    px = get_picarx()
-    px.backward(speed)
+    _actuator.put('backward', speed)
     if duration is not None:
-        time.sleep(duration)
-        px.stop()
+        _precise_sleep_until(perf_counter() + duration)
+        _actuator.put('stop')
 
 def stop() -> None:
     """Stop all motors."""
-    px = get_picarx()
-    px.stop()
+    _actuator.put('stop')
 
 def turn_left(angle: float, speed: int = 30, duration: Optional[float] = None) -> None:
     """Turn left by setting steering angle and driving forward. Optionally for a duration."""
-    px = get_picarx()
-    px.set_dir_servo_angle(-abs(angle))
-    px.forward(speed)
+    set_dir_servo(-abs(angle))
+    _actuator.put('forward', speed)
     if duration is not None:
-        time.sleep(duration)
-        px.stop()
-        px.set_dir_servo_angle(0)
+        _precise_sleep_until(perf_counter() + duration)
+        _stop_and_center()
 
 def turn_right(angle: float, speed: int = 30, duration: Optional[float] = None) -> None:
     """Turn right by setting steering angle and driving forward. Optionally for a duration."""
-    global _servo_angles
-    px = get_picarx()
-    px.set_dir_servo_angle(abs(angle))
-    _servo_angles['dir_servo'] = abs(angle)
-    px.forward(speed)
+    set_dir_servo(abs(angle))
+    _actuator.put('forward', speed)
     if duration is not None:
-        time.sleep(duration)
-        px.stop()
-        px.set_dir_servo_angle(0)
-        _servo_angles['dir_servo'] = 0
+        _precise_sleep_until(perf_counter() + duration)
+        _stop_and_center()
 
 def scan_360_degrees(num_photos: int = 8) -> List[str]:
     """Scan 360 degrees while stationary, taking photos at each position."""
-    global _servo_angles
-    photo_filenames = []
-    original_pan_angle = _servo_angles['cam_pan']
+    original_pan_angle = _pan_angle if _pan_angle is not None else 0
     
     # Calculate angles for 360 degree scan
-    angles = []
-    for i in range(num_photos):
-        angle = -35 + (70 * i / (num_photos - 1))  # Spread across -35 to +35 degrees
-        angles.append(angle)
+    angles = np.linspace(-35.0, 35.0, num_photos).tolist()  # Spread across -35 to +35 degrees
+    int_angles = [int(a) for a in angles]
+    photo_filenames = [f"scan_360_{i+1}_{int_angles[i]}_degrees.jpg" for i in range(num_photos)]
+    # Write futures, indexed like photo_filenames; None where no frame was available
+    pending = [None] * num_photos
+    taken = 0
     
     try:
-        for i, angle in enumerate(angles):
-            # Move camera to position
-            set_cam_pan_servo(angle)
-            time.sleep(0.5)  # Wait for servo to reach position
+        # Pipeline the scan: while frame i is JPEG-encoded and written on the
+        # JPEG writer thread, the servo is already swinging to angle i+1
+        set_cam_pan_servo(angles[0])
+        settle_deadline = perf_counter() + 0.5  # Wait for servo to reach position
+        for i, filename in enumerate(photo_filenames):
+            _precise_sleep_until(settle_deadline)
+            frame = _snapshot_frame()
+            
+            if i + 1 < len(angles):
+                set_cam_pan_servo(angles[i + 1])
+                settle_deadline = perf_counter() + 0.5
             
             # Take photo
-            filename = f"scan_360_{i+1}_{int(angle)}_degrees.jpg"
-            capture_image(filename)
-            photo_filenames.append(filename)
-            time.sleep(0.2)  # Brief pause between photos
+            if frame is not None:
+                pending[i] = _submit_frame(filename, frame)
+            taken = i + 1
+        for future in pending:
+            if future is not None:
+                future.result()
         
         # Return camera to original position
         set_cam_pan_servo(original_pan_angle)
         
     except Exception as e:
-        print(f"360 scan error: {e}")
+        logger.error("360 scan error: %s", e)
         # Try to return camera to original position
         set_cam_pan_servo(original_pan_angle)
     
-    return photo_filenames
+    return photo_filenames[:taken]
 
 def move_backward_safe(distance_cm: float = 20, speed: int = 30) -> bool:
     """Move backward safely for a specified distance."""
-    px = get_picarx()
+    if speed <= 0:
+        logger.error("Backward movement error: speed must be positive, got %s", speed)
+        return False
     
     # Calculate approximate duration based on distance and speed
     # This is rough - you may need to calibrate for your specific robot
     duration = distance_cm / (speed * 2)  # Rough approximation
     
     try:
-        px.backward(speed)
-        time.sleep(duration)
-        px.stop()
+        _actuator.put('backward', speed)
+        _precise_sleep_until(perf_counter() + duration)
+        _actuator.put('stop')
         return True
     except Exception as e:
-        print(f"Backward movement error: {e}")
-        px.stop()
+        logger.error("Backward movement error: %s", e)
+        _actuator.put('stop')
         return False
 
 def rotate_in_place(degrees: float, speed: int = 30) -> bool:
     """Rotate the robot in place by the specified degrees. Positive = clockwise, Negative = counter-clockwise."""
-    global _servo_angles
-    px = get_picarx()
-    
     try:
-        # Set steering to maximum angle for tightest turn
-        if degrees > 0:  # Clockwise rotation
-            px.set_dir_servo_angle(30)  # Max right steering
-            _servo_angles['dir_servo'] = 30
-            # Use differential motor speeds for in-place rotation
-            px.set_motor_speed(1, speed)   # Left motor forward
-            px.set_motor_speed(2, -speed)  # Right motor backward
-        else:  # Counter-clockwise rotation
-            px.set_dir_servo_angle(-30)  # Max left steering
-            _servo_angles['dir_servo'] = -30
-            # Use differential motor speeds for in-place rotation
-            px.set_motor_speed(1, -speed)  # Left motor backward
-            px.set_motor_speed(2, speed)   # Right motor forward
+        # Clockwise: steer max right, left motor forward, right motor backward;
+        # counter-clockwise mirrors it
+        direction = 1 if degrees > 0 else -1
+        set_dir_servo(30 * direction)  # Max steering for tightest turn
+        _set_both_motors(direction * speed, -direction * speed)
         
         # Calculate rotation duration (this needs calibration for your specific robot)
         # Rough estimate: 90 degrees takes about 1 second at speed 30
         duration = abs(degrees) / 90.0 * 1.0 * (30.0 / speed)
-        time.sleep(duration)
+        _precise_sleep_until(perf_counter() + duration)
         
         # Stop and reset steering
-        px.stop()
-        px.set_dir_servo_angle(0)
-        _servo_angles['dir_servo'] = 0
+        _stop_and_center()
         
         return True
     except Exception as e:
-        print(f"Rotation error: {e}")
-        px.stop()
-        px.set_dir_servo_angle(0)
-        _servo_angles['dir_servo'] = 0
+        logger.error("Rotation error: %s", e)
+        _stop_and_center()
         return False
 
 def turn_in_place_right(degrees: float = 45, speed: int = 30) -> bool:
@@ -248,11 +388,12 @@ def check_current_direction() -> dict:
     """Take a photo and check ultrasound in current direction to assess if it's an exit."""
     try:
         # Take photo in current direction
-        filename = f"direction_check_{int(time.time())}.jpg"
-        capture_image(filename)
+        filename = f"direction_check_{time.time_ns() // 1_000_000_000}.jpg"
+        capture_image(filename, wait=False)
         
-        # Get distance reading
+        # Get distance reading while the photo is written
         distance = get_ultrasound()
+        flush_pending_captures()
         
         # Assess if this direction looks like an exit
         is_clear = distance > 30  # Consider clear if > 30cm
@@ -266,7 +407,7 @@ def check_current_direction() -> dict:
             'assessment': 'EXIT CANDIDATE' if is_exit_candidate else 'CLEAR PATH' if is_clear else 'BLOCKED'
         }
     except Exception as e:
-        print(f"Direction check error: {e}")
+        logger.error("Direction check error: %s", e)
         return {
             'photo_filename': None,
             'distance_cm': 0,
@@ -278,6 +419,8 @@ def check_current_direction() -> dict:
 
 def assess_environment() -> dict:
     """Take a photo and get sensor readings to assess current environment."""
+    ts_ns = time.time_ns()
+    
     # Get distance reading
     distance = get_ultrasound()
     
@@ -285,91 +428,188 @@ def assess_environment() -> dict:
     servo_angles = get_servo_angles()
     
     # Take assessment photo
-    filename = f"assessment_{int(time.time())}.jpg"
+    filename = f"assessment_{ts_ns // 1_000_000_000}.jpg"
     capture_image(filename)
     
     return {
         'distance_cm': distance,
         'servo_angles': servo_angles,
         'photo_filename': filename,
-        'timestamp': time.time(),
+        'timestamp': ts_ns / 1e9,
         'too_close': distance < 15,  # Flag if too close to obstacle
         'safe_distance': distance > 30  # Flag if safe distance
     }
 
 # --- Sensor Functions ---
+# An HC-SR04 ping takes ~30 ms, so readings younger than _US_TTL are reused
+_US_TTL = 0.04
+_us_last_ts = float('-inf')
+_us_last_val = 0.0
+
 def get_ultrasound() -> float:
     """Return distance in centimeters from the ultrasonic sensor."""
-    px = get_picarx()
-    return px.ultrasonic.read()
+    global _us_last_ts, _us_last_val
+    now = perf_counter()
+    if now - _us_last_ts < _US_TTL:
+        return _us_last_val
+    _us_last_val = get_picarx().ultrasonic.read()
+    _us_last_ts = now
+    return _us_last_val
 
 def get_grayscale() -> list:
     """Return list of grayscale sensor readings (0-4095, left to right)."""
     px = get_picarx()
-    return px.get_grayscale_data()
+    with _hw_lock:
+        return px.get_grayscale_data()
 
 # --- Camera Functions ---
 _vilib_initialized = False
+# Serialises init_camera so a background warmup and a first capture can't both start the camera
+_camera_init_lock = threading.Lock()
+
+def _wait_camera_ready(timeout: float = 5.0) -> bool:
+    """Return True once Vilib's web stream is up, backing off between checks."""
+    deadline = perf_counter() + timeout
+    delay = 0.001
+    while perf_counter() < deadline:
+        if getattr(Vilib, 'flask_start', False):
+            return True
+        # Vilib exposes no readiness callback, so back off instead of spinning at 10 ms
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+    return False
 
 def init_camera() -> None:
     """Initialize the camera system. Call this once at startup."""
     global _vilib_initialized
-    if not _vilib_initialized:
+    if not _HAS_VILIB:
+        logger.error("Camera initialization error: vilib is not installed")
+        return
+    with _camera_init_lock:
+        if _vilib_initialized:
+            return
         try:
-            from vilib import Vilib
             Vilib.camera_start(vflip=False, hflip=False)
             Vilib.display(local=False, web=True)
             
             # Wait for camera to be ready
-            while True:
-                if hasattr(Vilib, 'flask_start') and Vilib.flask_start:
-                    break
-                time.sleep(0.01)
+            if not _wait_camera_ready(timeout=5.0):
+                logger.error("Camera initialization error: timed out waiting for camera stream")
+                Vilib.camera_close()
+                return
             
             time.sleep(0.5)  # Additional stabilization time
             _vilib_initialized = True
-            print("Camera initialized successfully")
+            logger.info("Camera initialized successfully")
         except Exception as e:
-            print(f"Camera initialization error: {e}")
+            logger.error("Camera initialization error: %s", e)
+
+# JPEG encode+write runs on one background thread; at most _JPEG_MAX_PENDING
+# frames are held in memory waiting for it
+_JPEG_MAX_PENDING = 4
+_jpeg_pool = ThreadPoolExecutor(max_workers=1)
+_jpeg_slots = threading.BoundedSemaphore(_JPEG_MAX_PENDING)
+
+def _submit_frame(filename: str, frame):
+    """Queue a snapshotted frame for writing. Returns a Future resolving to True if it was written."""
+    _jpeg_slots.acquire()
+    future = _jpeg_pool.submit(_write_frame, filename, frame)
+    future.add_done_callback(lambda _: _jpeg_slots.release())
+    return future
+
+def flush_pending_captures() -> None:
+    """Block until every queued capture has been written to disk."""
+    # The pool has a single worker, so a no-op job completes after all earlier writes
+    _jpeg_pool.submit(int).result()
+
+def capture_image(filename: str = "img_capture.jpg", wait: bool = True) -> bool:
+    """
+    Capture an image from the camera and save to filename. Returns True if the image was written.
+    With wait=False the write happens in the background and True means the frame was queued;
+    call flush_pending_captures() before reading the file.
+    """
+    # Capture image using the same method as gpt_car.py
+    frame = _snapshot_frame()
+    if frame is None:
+        return False
+    try:
+        future = _submit_frame(filename, frame)
+        return future.result() if wait else True
+    except Exception as e:
+        logger.error("Camera capture error: %s", e)
+    return False
+
+def _snapshot_frame():
+    """Copy the current camera frame so it can be written after the camera moves. Returns None if unavailable."""
+    if not _HAS_VILIB:
+        logger.error("Camera capture error: vilib is not installed")
+        return None
+    try:
+        if not _vilib_initialized:
+            init_camera()
+        if hasattr(Vilib, 'img') and Vilib.img is not None:
+            return Vilib.img.copy()
+        logger.warning("No image available from camera")
+    except Exception as e:
+        logger.error("Camera capture error: %s", e)
+    return None
+
+def _write_frame(filename: str, frame) -> bool:
+    """Write a snapshotted frame to filename. Returns True if the image was written."""
+    if cv2.imwrite(filename, frame):
+        logger.info("Image saved as %s", filename)
+        return True
+    logger.error("Failed to write %s", filename)
+    return False
 
-def capture_image(filename: str = "img_capture.jpg") -> None:
-    """Capture an image from the camera and save to filename. Camera must be initialized first."""
+def capture_image_bytes(quality: int = 85, max_edge: Optional[int] = None) -> Optional[bytes]:
+    """
+    Encode the current camera frame as JPEG bytes without writing a file.
+    If max_edge is set, frames with a longer side are downscaled to fit it.
+    Returns None if no frame is available.
+    """
+    if not _HAS_VILIB:
+        logger.error("Camera capture error: vilib is not installed")
+        return None
     try:
-        from vilib import Vilib
-        import cv2
-        
-        # Initialize camera if not already done
         if not _vilib_initialized:
             init_camera()
         
-        # Capture image using the same method as gpt_car.py
         if hasattr(Vilib, 'img') and Vilib.img is not None:
-            cv2.imwrite(filename, Vilib.img)
-            print(f"Image saved as {filename}")
+            img = Vilib.img
+            if max_edge is not None:
+                h, w = img.shape[:2]
+                scale = max_edge / max(h, w)
+                if scale < 1:
+                    img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok:
+                return buf.tobytes()
+            logger.error("JPEG encoding failed")
         else:
-            print("No image available from camera")
+            logger.warning("No image available from camera")
     except Exception as e:
-        print(f"Camera capture error: {e}")
+        logger.error("Camera capture error: %s", e)
+    return None
 
 def take_photo_vilib(name: str = None, path: str = "./") -> str:
     """Take a photo using Vilib's built-in photo function."""
+    if not _HAS_VILIB:
+        logger.error("Photo capture error: vilib is not installed")
+        return ""
     try:
-        from vilib import Vilib
-        import time
-        
         if not _vilib_initialized:
             init_camera()
         
         if name is None:
-            from time import strftime, localtime
-            name = f'photo_{strftime("%Y-%m-%d-%H-%M-%S", localtime(time.time()))}'
+            name = f'photo_{time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime(time.time()))}'
         
         Vilib.take_photo(name, path)
         full_path = f"{path}{name}.jpg"
-        print(f'Photo saved as {full_path}')
+        logger.info("Photo saved as %s", full_path)
         return full_path
     except Exception as e:
-        print(f"Photo capture error: {e}")
+        logger.error("Photo capture error: %s", e)
         return ""
 
 def close_camera() -> None:
@@ -377,21 +617,24 @@ def close_camera() -> None:
     global _vilib_initialized
     if _vilib_initialized:
         try:
-            from vilib import Vilib
             Vilib.camera_close()
             _vilib_initialized = False
-            print("Camera closed")
+            logger.info("Camera closed")
         except Exception as e:
-            print(f"Camera close error: {e}")
+            logger.error("Camera close error: %s", e)
 
 # --- Speaker Function ---
+# Sound files already found on disk, so repeat plays skip the stat() call
+_verified_sound_paths = set()
+
 def play_sound(filename: str, volume: int = 100) -> None:
     """Play a sound file through the robot's speaker."""
     music = get_music()
-    if os.path.isfile(filename):
+    if filename in _verified_sound_paths or os.path.isfile(filename):
+        _verified_sound_paths.add(filename)
         music.sound_play(filename, volume)
     else:
-        print(f"Sound file not found: {filename}")
+        logger.warning("Sound file not found: %s", filename)
 
 # --- Additional Primitives from Examples ---
 def reset_servo(servo_id: int, angle: float = 0) -> None:
@@ -425,32 +668,38 @@ def get_cliff_status(val_list: list) -> bool:
 
 def camera_start(vflip: bool = False, hflip: bool = False) -> None:
     """Start the camera with optional vertical/horizontal flip."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.camera_start(vflip=vflip, hflip=hflip)
 
 def camera_display(local: bool = True, web: bool = True) -> None:
     """Display the camera feed locally and/or on the web."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.display(local=local, web=web)
 
 def color_detect(color: str) -> None:
     """Start color detection for the specified color (e.g., 'red', 'blue')."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.color_detect(color)
 
 def face_detect_switch(flag: bool) -> None:
     """Enable or disable face detection."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.face_detect_switch(flag)
 
 def qrcode_detect_switch(flag: bool) -> None:
     """Enable or disable QR code detection."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.qrcode_detect_switch(flag)
 
 def take_photo(name: str, path: str) -> None:
     """Take a photo and save it to the specified path with the given name."""
-    from vilib import Vilib
+    if not _HAS_VILIB:
+        return
     Vilib.take_photo(name, path)
 
 # --- Example Usage ---
@@ -463,6 +712,7 @@ if __name__ == "__main__":
     turn_left(20, 30, 0.5)
     drive_backward(30, 1)
     stop()
+    flush_actuators()
     print(f"Ultrasound: {get_ultrasound():.1f} cm")
     print(f"Grayscale: {get_grayscale()}")
     capture_image("test.jpg")
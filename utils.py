@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 
 GRAY = '1;30'
 RED = '0;31'
@@ -90,3 +91,44 @@ def speak_block(music, name, volume=100):
     else:
         warn(f'No sound found for {name}')
         return False
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=134217728",
+)
+
+def tune_sqlite(conn):
+    """
+    Apply WAL and cache PRAGMAs to a sqlite3 connection, cutting fsyncs on the SD card
+
+    :param conn: connection to tune
+    :type conn: sqlite3.Connection
+    """
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+
+_sqlite_local = threading.local()
+
+def get_sqlite_connection(db_path):
+    """
+    Return this thread's shared, tuned connection to db_path, opening it on first use
+
+    :param db_path: sqlite database file
+    :type db_path: str
+    :return: connection reused by every session on this thread
+    :rtype: sqlite3.Connection
+    """
+    conns = getattr(_sqlite_local, 'conns', None)
+    if conns is None:
+        conns = _sqlite_local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        import sqlite3
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        tune_sqlite(conn)
+        conns[db_path] = conn
+    return conn